@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from wordle_constraints import Constraints
+from wordle_patterns import (
+    ANSWERS_FILE,
+    GUESSES_FILE,
+    MAX_WORD_LENGTH,
+    PatternTable,
+    decode_words,
+    encode_words,
+    feedback_patterns,
+    pattern_to_results,
+    results_to_pattern,
+    score_guess,
+)
+
+
+def words(codes):
+    return np.char.decode(decode_words(codes), "ascii").tolist()
+
+
+def check_feedback(guess_codes, answer_codes):
+    """
+    Checks feedback_patterns against score_guess for every guess x answer
+    pair, and that the answers giving the first guess each pattern are
+    exactly the ones the constraints of that row allow.
+    """
+    patterns = feedback_patterns(guess_codes, answer_codes)
+    guesses = words(guess_codes)
+    answers = words(answer_codes)
+    for guess, row in zip(guesses, patterns.tolist()):
+        for answer, pattern in zip(answers, row):
+            assert pattern == results_to_pattern(score_guess(guess, answer)), (
+                guess,
+                answer,
+            )
+    guess, row = guesses[0], patterns[0]
+    for pattern in set(row.tolist()):
+        constraints = Constraints.from_row(
+            guess, pattern_to_results(pattern, len(guess))
+        )
+        for answer, matches in zip(answers, row == pattern):
+            assert constraints.allows(answer) == matches, (guess, answer, pattern)
+
+
+@pytest.mark.parametrize("word_length", range(1, MAX_WORD_LENGTH + 1))
+@pytest.mark.parametrize("num_letters", [2, 3, 4, 26])
+def test_random_words(word_length, num_letters):
+    # Small alphabets make most words repeat characters.
+    rng = np.random.default_rng(word_length * 100 + num_letters)
+    guess_codes = rng.integers(0, num_letters, (16, word_length), dtype=np.uint8)
+    answer_codes = rng.integers(0, num_letters, (64, word_length), dtype=np.uint8)
+    check_feedback(guess_codes, np.concatenate([answer_codes, guess_codes]))
+
+
+@pytest.mark.parametrize("word_length", range(1, MAX_WORD_LENGTH + 1))
+def test_same_word_is_all_correct(word_length):
+    rng = np.random.default_rng(word_length)
+    codes = rng.integers(0, 3, (32, word_length), dtype=np.uint8)
+    patterns = feedback_patterns(codes, codes)
+    assert (np.diagonal(patterns) == 3**word_length - 1).all()
+
+
+def test_repeated_letters():
+    for guess, answer, results in [
+        ("speed", "abide", "absent absent present absent present"),
+        ("eerie", "there", "present absent present absent correct"),
+        ("llama", "hello", "present present absent absent absent"),
+    ]:
+        codes = feedback_patterns(encode_words([guess]), encode_words([answer]))
+        assert pattern_to_results(int(codes[0, 0])) == results.split()
+
+
+def test_word_lists():
+    table = PatternTable.load()
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(table.guesses), 20, replace=False)
+    guess_codes = encode_words([table.guesses[idx] for idx in sample])
+    check_feedback(guess_codes, encode_words(table.answers))
+    assert (
+        table.matrix[sample]
+        == feedback_patterns(guess_codes, encode_words(table.answers))
+    ).all()
+
+
+def test_guesses_overlapping_answers(tmp_path):
+    with open(ANSWERS_FILE) as fh:
+        answers = fh.read().split()[:30]
+    with open(GUESSES_FILE) as fh:
+        guesses = fh.read().split()[:100]
+    answers_file = tmp_path / "answers.txt"
+    guesses_file = tmp_path / "guesses.txt"
+    answers_file.write_text("\n".join(answers))
+    # A dictionary holding the answers as well, and a guess listed twice.
+    guesses_file.write_text("\n".join(guesses + answers + guesses[:1]))
+    table = PatternTable.load(
+        str(answers_file),
+        str(guesses_file),
+        cache_dir=str(tmp_path / "cache"),
+    )
+    assert table.guesses == guesses + answers
+    assert table.matrix.shape == (130, 30)
+    for idx, answer in enumerate(answers):
+        assert table.matrix[table.guess_index[answer], idx] == table.all_correct
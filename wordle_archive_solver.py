@@ -1,76 +1,56 @@
 from datetime import datetime
 from datetime import date
+import argparse
+import asyncio
 import json
 import logging
-import re
+import multiprocessing
+import multiprocessing.util
+import os
 import sys
 import time
-from collections import Counter
 
 from rich import print as rprint
-from rich.progress import track
-from selenium import webdriver
-from selenium.webdriver.common.by import By
+from selenium.common.exceptions import WebDriverException
+
+from wordle_async import BrowserGame, play
+from wordle_browser import new_chrome, reset_page
+from wordle_guess_cache import GUESS_CACHE_FILE, GuessCache
+from wordle_openers import best_opener
+from wordle_patterns import PatternTable
+from wordle_simulate import print_guess_cache, summarize, summarize_guess_cache
+from wordle_sites import ArchiveAdapter
+from wordle_solver import Solver
+from wordle_strategy import get_strategy
+from wordle_trace import traced, tracer
 
 
 start_word = "tizzy"
+# Use the best opener from wordle_openers.json (if ranked) over start_word.
+use_ranked_opener = True
+strategy_name = "entropy"
+# Every guess must use the greens and yellows revealed so far. Turn hard
+# mode on in the game's settings as well.
+hard_mode = False
+# Type each word with key presses in one call, clicking the on-screen
+# keyboard only if the page does not take them.
+use_physical_keyboard = True
 archive_number = 7
 dark_mode = False
+REPORT_FILE = "wordle_archive_report.json"
+# Picks for sets of remaining words already scored, kept across --batch runs.
+# None to score every set afresh.
+guess_cache_file = GUESS_CACHE_FILE
 start_time = time.time()
-current_word_list = []
-new_word = ""
-
-keyboard = {
-    "q": "div:nth-child(1) > button:nth-child(1) > div",
-    "w": "div:nth-child(1) > button:nth-child(2)",
-    "e": "div:nth-child(1) > button:nth-child(3)",
-    "r": "div:nth-child(1) > button:nth-child(4)",
-    "t": "div:nth-child(1) > button:nth-child(5)",
-    "y": "div:nth-child(1) > button:nth-child(6)",
-    "u": "div:nth-child(1) > button:nth-child(7)",
-    "i": "div:nth-child(1) > button:nth-child(8)",
-    "o": "div:nth-child(1) > button:nth-child(9)",
-    "p": "div:nth-child(1) > button:nth-child(10)",
-    "a": "div:nth-child(2) > button:nth-child(1) > div",
-    "s": "div:nth-child(2) > button:nth-child(2)",
-    "d": "div:nth-child(2) > button:nth-child(3)",
-    "f": "div:nth-child(2) > button:nth-child(4)",
-    "g": "div:nth-child(2) > button:nth-child(5)",
-    "h": "div:nth-child(2) > button:nth-child(6)",
-    "j": "div:nth-child(2) > button:nth-child(7)",
-    "k": "div:nth-child(2) > button:nth-child(8)",
-    "l": "div:nth-child(2) > button:nth-child(9)",
-    "enter": "div:nth-child(3) > button:nth-child(1)",
-    "z": "div:nth-child(3) > button:nth-child(2)",
-    "x": "div:nth-child(3) > button:nth-child(3)",
-    "c": "div:nth-child(3) > button:nth-child(4)",
-    "v": "div:nth-child(3) > button:nth-child(5)",
-    "b": "div:nth-child(3) > button:nth-child(6)",
-    "n": "div:nth-child(3) > button:nth-child(7)",
-    "m": "div:nth-child(3) > button:nth-child(8)",
-    "del": "div:nth-child(3) > button:nth-child(9)",
-}
-
-
-def sendkeys(web_driver, word):
-    """
-    This function take the webdriver and a string (word) as
-    input which is then entered into the Wordle Puzzle one
-    Charater at a time.
 
-    Args:
-        web_driver (selenium.webdriver): The Keyboard Shadow DOM from Wordle.
-        word (str): Word to be entered into the current row of the wordle puzzle.
-    Returns:
-        None
-    """
-    for char in track(word, description="Entering the Word"):
-        web_driver.find_element(By.CSS_SELECTOR, keyboard[char]).click()
-        time.sleep(0.75)
-    web_driver.find_element(By.CSS_SELECTOR, keyboard["enter"]).click()
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(message)s",
+    filename="wordle_solve.log",
+)
 
 
-def solution_found(result_list):
+def solution_found(result_list, word_guess):
     """
     Get the input dictionary with determination of each character's validity
     and returns a true/false bool to indicate if the solution has been
@@ -78,214 +58,80 @@ def solution_found(result_list):
 
     Args:
         result_dict (dict): Dictionary with wordle result for each character in the word.
+        word_guess (str): Word entered into the row.
     Returns:
         Bool with True or False to indicate if the wordle solution has been found.
     """
     if set(result_list) == {"correct"}:
         rprint("Congratulations - Solution Found \U0001F44D")
-        rprint(f"Correct Word is {new_word}")
+        rprint(f"Correct Word is {word_guess}")
         rprint(f"Script Execution Time = {time.time() - start_time:.2f} Secs")
         rprint("Scripted by Sachin Shenoy")
         rprint("Twitter: https://twitter.com/sachinshenoy")
     return set(result_list) == {"correct"}
 
 
-def load_words(file_name):
-    """
-    Loads the words from the filename (One word per line) provided
-    and cleans up the words list to ensure that the words are stripped
-    of any whitespaces and are only 5 characters long and are in lower case.
+def print_recommendation(session):
+    rprint(f"Current Word List length - {len(session.candidates)}")
+    rprint(f"Recommended Word : {session.next_word} ({session.solver.strategy.name})")
 
 
-    Returns:
-        [list]: List of words from the file containing the words.
+def load_solver():
     """
-    five_letter_words = []
-    # Loads the Dictionary text file
-    with open(file_name) as word_file:
-        lines = word_file.readlines()
-        # Filter all words which are not 5 letters.
-        for line in lines:
-            if len(line.strip()) == 5:
-                five_letter_words.append(line.strip().lower())
-    print(f"Number of words in the {file_name} - {len(five_letter_words)}")
-    return five_letter_words
-
-
-def find_bg(web_driver, row_number):
+    Loads the word lists and precomputed tables, and picks the start word:
+    the best ranked opener if use_ranked_opener is set, else start_word.
+
+    Returns:
+        [Solver]: Solver shared by every game played by the script.
     """
-    Identifies the background colors of the words from the results grid
-    and assigns them results as follows to list:
-    Green: "correct"
-    Yellow: "present"
-    Gray: "absent"
-    These results are then returned for each character in the word
-    as a list of results.
+    table = PatternTable.load()
+    print(f"Number of words in the wordle_words.txt - {len(table.answers)}")
+    print(f"Number of allowed guesses - {len(table.guesses)}")
+    word = best_opener(table, start_word) if use_ranked_opener else start_word
 
-    Args:
-        web_driver (selenium.webdrider): Selenium Webdriver
-        row_number (int): Row number for which the results are needed.
+    # Check the Start Word is Valid !!
+    if not (word in table.guess_index) or not (len(word) == 5):
+        rprint("Uh Oh - Please check 'Start Word' \U0001F622")
+        rprint(f"Script Execution Time = {time.time() - start_time: .2f} Secs")
+        rprint("Scripted by Sachin Shenoy")
+        rprint("Twitter: https://twitter.com/sachinshenoy")
+        sys.exit()
+    return Solver(table, get_strategy(strategy_name), word, hard_mode=hard_mode)
 
-    Returns:
-        [list]: List containing 5 elements with correspond to each
-        character in the row being analyzed
+
+def archive_site(show_progress=True):
     """
-    char_results = []
-    result_list = []
-    for i in range(1, 6):
-        game_row = web_driver.find_element(
-            By.CSS_SELECTOR, f"span:nth-child({i+(row_number-1)*5})"
-        )
-        cell_bg = game_row.value_of_css_property("background-color")
-        result_list.append(cell_bg)
-        # rprint(cell_bg)
-
-    for bg in track(result_list, description="Analyzing Results"):
-        match bg:
-            case "rgba(234, 179, 8, 1)" | "rgba(201, 180, 88, 1)":
-                char_results.append("present")
-            case "rgba(96, 102, 133, 1)" | "rgba(120, 124, 126, 1)":
-                char_results.append("absent")
-            case "rgba(99, 170, 85, 1)" | "rgba(106, 170, 100, 1)":
-                char_results.append("correct")
-            case "rgba(54, 57, 74, 1)" | "rgba(231, 232, 238, 1)":
-                char_results.append("other")
-            case default:
-                char_results.append("other")
-    # rprint(f"Word Result - {char_results}")
-    return char_results
-
-
-def solve_row(row_results, word_guess):
+    Returns:
+        [ArchiveAdapter]: Adapter for the archive page set up as configured
+        at the top of the script.
     """
-    Receives a dictionary with the results of the previous word entered.
-    It then performs two actions:
-    1. Eliminates words from the possible word list.
-    2. Checks this list against the WordAPI (RapidAPI) for popularity
-    using the frequency metric.
+    return ArchiveAdapter(
+        dark_mode=dark_mode,
+        physical_keyboard=use_physical_keyboard,
+        show_progress=show_progress,
+    )
 
-    The most popular word is then returned.This word with
-    the highest frequency is considered more likely as it would be less
-    obscure.
+
+def play_puzzle(web_driver, site, session, on_row=None):
+    """
+    Plays the open puzzle to the end. The next word for every feedback a
+    row can get is worked out while the row is being revealed.
 
     Args:
-        row_result (dictionary): Dictionary of each character of the previous
-        word with the results like "present", "absent" or "correct"
+        web_driver (selenium.webdriver): Selenium Webdriver
+        site (GameSiteAdapter): Adapter for the page the puzzle is open on.
+        session (SolverSession): New game from the solver.
+        on_row (callable): on_row(row_number, word, row_results) is called
+        once each row is recorded, nothing is printed if None.
 
     Returns:
-        [str]: Best solution word based on previous results
+        [dict]: The words entered and whether the puzzle was solved.
     """
-    multi_char = {}
-
-    # Checks if a word guess has repeating characters. If there is a charater
-    # repearing, it then updates the multi_char dictionary with the row
-    # result determination of each of those repeating charaters.
-    # This is done using regex. The span for each finditer result
-    # returns a tuple with the location where the substring started and ended.
-    # We use the starting position of the substring to gather the row result
-    # for that character from the row_result list and add all the findings
-    # is to a temp list which is then added to the multi_char dictionary
-    # and used further down in the word elimination logic.
-
-    if len(set(word_guess)) < 5:
-        for char, occurance in Counter(word_guess).most_common():
-            if occurance > 1:
-                temp_list = []
-                matches = re.finditer(char, word_guess)
-                for result in matches:
-                    temp_list.append(row_results[result.span()[0]])
-                multi_char[char] = temp_list
-
-    word_list = current_word_list.copy()
-    for idx, guess in enumerate(zip(word_guess, row_results)):
-        match guess[1]:
-            case "present":
-                for word in word_list:
-                    if not (guess[0] in word) or (guess[0] == word[idx]):
-                        current_word_list.remove(word)
-                word_list = current_word_list.copy()
-            case "absent":
-                for word in word_list:
-                    if guess[0] in word and Counter(word_guess)[guess[0]] == 1:
-                        current_word_list.remove(word)
-                    elif (
-                        guess[0] in word
-                        and Counter(word_guess)[guess[0]] > 1
-                        and set(multi_char[guess[0]]) == {"absent"}
-                    ):
-                        current_word_list.remove(word)
-                    elif guess[0] == word[idx]:
-                        current_word_list.remove(word)
-                word_list = current_word_list.copy()
-            case "correct":
-                for word in word_list:
-                    if (
-                        not (guess[0] == word[idx])
-                        # and Counter(word_guess)[guess[0]] == 1
-                    ):
-                        current_word_list.remove(word)
-                word_list = current_word_list.copy()
-
-            case "other":
-                print(f"Character - {guess[0]} at index {idx} has state 'other'")
-                sys.exit("Something went wrong. Character status incorrect !")
-    # Check if a word guess has repeating characters. If there is a charater
-    # repearing, it then checks to see if both the characters need to exist
-    # in the word based of word results.
-    # i.e : If one is present and other is correct or the other way around.
-    # If that is the case then it will remove all words from the word list
-    # which do not have these characters.
-    # Assumption: There can only be two or three repeating characters
-    if len(set(word_guess)) < 5:
-        for char, occurance in Counter(word_guess).most_common():
-            if occurance > 1:
-                match multi_char[char]:
-                    case ["present", "correct"] | ["correct", "present"]:
-                        for word in word_list:
-                            if Counter(word)[char] != occurance:
-                                current_word_list.remove(word)
-                    case ["present", "correct", "correct"] | [
-                        "present",
-                        "correct",
-                        "present",
-                    ] | ["correct", "present", "present"] | [
-                        "correct",
-                        "present",
-                        "correct",
-                    ]:
-                        for word in word_list:
-                            if Counter(word)[char] != occurance:
-                                current_word_list.remove(word)
-        word_list = current_word_list.copy()
-
-    # rprint(f"Multi Character Dictionary: {multi_char}")
-    rprint(f"Current Word List length - {str(len(word_list))}")
-
-    # This is the avoid a API Call to get word frequencies
-    # as we know the second word is going to be 'stomp'
-    # if "".join(row_result.keys()) == "uraei":
-    #     return {7.0: "stomp"}
-
-    word_dict = {}
-    max_frequency = 0
-
-    with open("words_json.txt", "r") as fh:
-        frequency_dict = json.load(fh)
-
-    for word in word_list:
-        word_dict[word] = frequency_dict[word]
-        if max_frequency < word_dict[word]:
-            recommended_word = word
-            max_frequency = word_dict[word]
-
-    # reverse_sorted_keys = sorted(word_dict, reverse=True)
-    current_word_list.remove(recommended_word)
-    # rprint(f"Word-Dict: {word_dict}")
-    # rprint(f"API Cache Hit Rate : {(cache_count*100)/len(word_list):.2f} %")
-    rprint(
-        f"Recommended Word : {recommended_word}, Frequency : {word_dict[recommended_word]}"
+    game = BrowserGame(
+        lambda word, row_number: site.enter_word(web_driver, word, row_number),
+        lambda row_number: site.reveal_row(web_driver, row_number),
     )
-    return recommended_word
+    return asyncio.run(play(game, session, on_row=on_row))
 
 
 def main():
@@ -295,20 +141,8 @@ def main():
     Output: Solution to the Wordle Puzzle by controlling the browser
     """
 
-    global current_word_list
-    global new_word
-    current_word_list = load_words("wordle_words.txt")
-    allowed_guesses = load_words("wordle_allowed_guesses.txt")
-
-    # Check the Start Word is Valid !!
-    if not (start_word in current_word_list or start_word in allowed_guesses) or not (
-        len(start_word) == 5
-    ):
-        rprint("Uh Oh - Please check 'Start Word' \U0001F622")
-        rprint(f"Script Execution Time = {time.time() - start_time: .2f} Secs")
-        rprint("Scripted by Sachin Shenoy")
-        rprint("Twitter: https://twitter.com/sachinshenoy")
-        sys.exit()
+    solver = load_solver()
+    session = solver.new_session()
 
     # Check the Archive Number is Valid:
     current_wordle_number = (date(2022, 2, 9) - date.today()).days + 235
@@ -320,70 +154,187 @@ def main():
         rprint("Twitter: https://twitter.com/sachinshenoy")
         sys.exit()
 
-    options = webdriver.ChromeOptions()
-    options.add_experimental_option("excludeSwitches", ["enable-logging"])
-    options.add_experimental_option("detach", True)
-
-    driver = webdriver.Chrome(options=options)
-    driver.get(f"https://www.devangthakkar.com/wordle_archive/?{archive_number}")
-    driver.implicitly_wait(5)
-
-    #
-    # Close the initial Welcome Screen
-    #
-    close_button = driver.find_element(
-        By.CSS_SELECTOR, "body > div:nth-child(5) > div > div > div > button"
-    )
-    close_button.click()
-
-    # Turn On Dark Mode
-    if dark_mode:
-        settings_button = driver.find_element(By.CSS_SELECTOR, "button:nth-child(1)")
-        settings_button.click()
-        darkmode_button = driver.find_element(By.CSS_SELECTOR, "#headlessui-switch-3")
-        darkmode_button.click()
-        close_settings = driver.find_element(
-            By.CSS_SELECTOR,
-            "body > div:nth-child(6) > div > div > div > div > div > button",
-        )
-        close_settings.click()
-
-    # Send the Start Word
-    sendkeys(driver, start_word)
-    time.sleep(2)
-    row_results = find_bg(driver, 1)
-    rprint(row_results)
-    new_word = solve_row(row_results, start_word)
-    if solution_found(row_results):
-        driver.find_element(
-            By.CSS_SELECTOR,
-            "body > div:nth-child(5) > div > div > div > div > div > button",
-        ).click()
-        sys.exit()
+    site = archive_site()
+    driver = new_chrome(detach=True)
+    site.open(driver, archive_number)
 
-    # sendkeys(driver, "stomp")
-    # time.sleep(3)
-    # row_results = find_bg(driver, 2)
-    # new_word = solve_row(row_results, "stomp")
-    # if solution_found(row_results):
-    #     sys.exit()
-
-    for i in range(2, 7):
-        sendkeys(driver, new_word)
-        time.sleep(2)
-        row_results = find_bg(driver, i)
+    def print_row(row_number, word_guess, row_results):
         rprint(row_results)
-        if solution_found(row_results):
-            driver.find_element(
-                By.CSS_SELECTOR,
-                "body > div:nth-child(5) > div > div > div > div > div > button",
-            ).click()
-            sys.exit()
-        else:
-            new_word = solve_row(row_results, new_word)
+        if not session.solved:
+            print_recommendation(session)
+
+    try:
+        result = play_puzzle(driver, site, session, on_row=print_row)
+    except ValueError as e:
+        sys.exit(f"Something went wrong. {e} !")
+    if result["solved"]:
+        word_guess, row_results = session.history[-1]
+        solution_found(row_results, word_guess)
+        site.close_result(driver)
+        sys.exit()
     rprint("Uh Oh - Couldn't find the Solution \U0001F622")
     rprint(f"Script Execution Time = {time.time() - start_time: .2f} Secs")
 
 
+_solver = None
+_site = None
+_driver = None
+
+
+def _init_worker(word, hard_mode):
+    global _solver
+    global _site
+    table = PatternTable.load()
+    _solver = Solver(
+        table,
+        get_strategy(strategy_name),
+        word,
+        hard_mode=hard_mode,
+        guess_cache=GuessCache.load(table, guess_cache_file),
+    )
+    _site = archive_site(show_progress=False)
+
+
+def _solve_puzzle(number):
+    global _driver
+    puzzle_start = time.perf_counter()
+    if _driver is None:
+        # Started here rather than in _init_worker, where a failure would
+        # make the pool restart the worker forever.
+        _driver = new_chrome(headless=True)
+        # Quit Chrome when the worker exits, the session is reused until then.
+        multiprocessing.util.Finalize(_driver, _driver.quit, exitpriority=16)
+    session = _solver.new_session()
+    try:
+        _site.open(_driver, number)
+        result = play_puzzle(_driver, _site, session)
+    except (WebDriverException, ValueError) as e:
+        logging.warning(f"Archive puzzle {number} failed: {e}")
+        result = {
+            "guesses": [word_guess for word_guess, _ in session.history],
+            "solved": False,
+            "error": str(e),
+        }
+    finally:
+        try:
+            reset_page(_driver)
+        except WebDriverException:
+            pass
+    result["archive_number"] = number
+    result["elapsed"] = time.perf_counter() - puzzle_start
+    result["guess_cache"] = {"worker": os.getpid(), **_solver.guess_cache.stats()}
+    result["guess_cache_entries"] = _solver.guess_cache.take_new()
+    return result
+
+
+def solve_archive(first, last, sessions, word):
+    """
+    Solves the archive puzzles first to last (inclusive) in headless Chrome,
+    spread over a pool of worker processes which each keep one browser
+    session open and reuse it from puzzle to puzzle.
+
+    Args:
+        first (int): First archive number.
+        last (int): Last archive number.
+        sessions (int): Number of browser sessions.
+        word (str): Start word.
+
+    Returns:
+        [dict]: The result of each puzzle and a summary of the run.
+    """
+    batch_start = time.time()
+    results = []
+    with multiprocessing.Pool(
+        sessions, initializer=_init_worker, initargs=(word, hard_mode)
+    ) as pool:
+        for result in pool.imap_unordered(_solve_puzzle, range(first, last + 1)):
+            rprint(
+                f"#{result['archive_number']} : {' '.join(result['guesses'])} "
+                f"{'Solved' if result['solved'] else 'Failed'} "
+                f"({result['elapsed']:.1f} Secs)"
+            )
+            results.append(result)
+        pool.close()
+        pool.join()
+    results.sort(key=lambda result: result["archive_number"])
+    summary = summarize(
+        [{**result, "answer": result["archive_number"]} for result in results],
+        time.time() - batch_start,
+    )
+    summary.update(
+        start_word=word,
+        strategy=strategy_name,
+        hard_mode=hard_mode,
+        sessions=sessions,
+    )
+    summary["guess_cache"] = summarize_guess_cache(results)
+    new_entries = [result.pop("guess_cache_entries") for result in results]
+    if guess_cache_file:
+        guess_cache = GuessCache.load(PatternTable.load(), guess_cache_file)
+        for entries in new_entries:
+            guess_cache.update(entries)
+        guess_cache.save(guess_cache_file)
+    return {"summary": summary, "puzzles": results}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Solve Wordle Archive puzzles.")
+    parser.add_argument(
+        "--batch",
+        nargs=2,
+        type=int,
+        metavar=("FIRST", "LAST"),
+        help="Solve archive puzzles FIRST to LAST in headless browsers "
+        "instead of archive_number in a visible one.",
+    )
+    parser.add_argument(
+        "--sessions",
+        type=int,
+        default=4,
+        help="Number of headless browser sessions for --batch.",
+    )
+    parser.add_argument("--output", default=REPORT_FILE)
+    parser.add_argument(
+        "--hard-mode",
+        action="store_true",
+        help="Only enter guesses which use every hint revealed so far.",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Time each stage of solving archive_number and save a Chrome "
+        "trace to FILE.",
+    )
+    args = parser.parse_args()
+    if args.batch and not 1 <= args.batch[0] <= args.batch[1]:
+        parser.error("--batch needs 1 <= FIRST <= LAST")
+    return args
+
+
+def batch_main(args):
+    solver = load_solver()
+    report = solve_archive(*args.batch, args.sessions, solver.start_word)
+    summary = report["summary"]
+    for row, count in summary["distribution"].items():
+        rprint(f"{row} : {count}")
+    failures = ", ".join(str(number) for number in summary["failures"])
+    rprint(f"Failed Puzzles : {failures or 'None'}")
+    rprint(f"Average Guesses : {summary['mean_guesses']:.3f}")
+    rprint(
+        f"Puzzles / Min : {summary['games_per_sec'] * 60:.1f} "
+        f"({args.sessions} sessions, {summary['elapsed']:.2f} Secs)"
+    )
+    print_guess_cache(summary["guess_cache"])
+    with open(args.output, "w") as fh:
+        json.dump(report, fh, indent=1)
+    rprint(f"Report saved to {args.output}")
+
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    hard_mode = hard_mode or args.hard_mode
+    if args.batch:
+        batch_main(args)
+    else:
+        with traced(args.trace), tracer.span("game"):
+            main()
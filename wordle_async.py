@@ -0,0 +1,125 @@
+import asyncio
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from wordle_simulate import MAX_ROWS, WordleOracle
+from wordle_trace import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserGame:
+    """
+    A puzzle open in a browser, driven by the blocking Selenium functions of
+    a script. They are run on worker threads so the event loop stays free.
+    """
+
+    def __init__(self, enter, reveal):
+        """
+        Args:
+            enter (callable): enter(word, row_number) types the word.
+            reveal (callable): reveal(row_number) waits for the row to be
+            revealed and returns its results.
+        """
+        self.enter = enter
+        self.reveal = reveal
+
+
+class OracleGame:
+    """
+    A puzzle against a local WordleOracle whose rows take reveal_delay
+    seconds to be revealed, like the board's flip animation. Used to
+    measure how much of the animation the solver's work hides.
+    """
+
+    def __init__(self, answer, reveal_delay=1.5):
+        self.answer = answer
+        self.oracle = WordleOracle(answer)
+        self.reveal_delay = reveal_delay
+        self._rows = {}
+
+    def enter(self, word, row_number):
+        with tracer.span("key_entry", row=row_number):
+            self._rows[row_number] = self.oracle.guess(word)
+
+    def reveal(self, row_number):
+        with tracer.span("reveal", row=row_number):
+            time.sleep(self.reveal_delay)
+            return self._rows[row_number]
+
+
+async def play(game, session, executor=None, on_row=None):
+    """
+    Plays a game, working out the next word for every feedback the row can
+    get while the row is being revealed, so the real feedback only needs a
+    lookup.
+
+    Args:
+        game (BrowserGame): Game to play, or anything with enter and reveal.
+        session (SolverSession): New game from the solver.
+        executor (concurrent.futures.Executor): Runs the blocking calls,
+        the loop's default executor if None.
+        on_row (callable): on_row(row_number, word, row_results) is called
+        once each row is recorded, e.g. to print the game's progress.
+
+    Returns:
+        [dict]: The words entered and whether the puzzle was solved.
+    """
+    loop = asyncio.get_running_loop()
+
+    def run(func, *args):
+        # run_in_executor does not pass on contextvars, which tag the spans.
+        context = contextvars.copy_context()
+        return loop.run_in_executor(executor, context.run, func, *args)
+
+    word = session.start_word
+    for row_number in range(1, MAX_ROWS + 1):
+        row_start = time.perf_counter()
+        await run(game.enter, word, row_number)
+        row_results, plan = await asyncio.gather(
+            run(game.reveal, row_number), run(session.plan, word)
+        )
+        if "other" in row_results:
+            raise ValueError(f"Row {row_number} was not revealed")
+        next_word = session.update(word, row_results, plan)
+        if on_row is not None:
+            on_row(row_number, word, row_results)
+        logger.info(
+            f"Row {row_number} played in "
+            f"{(time.perf_counter() - row_start) * 1000:.0f} ms"
+        )
+        word = next_word
+        if word is None:
+            break
+    return {
+        "guesses": [word_guess for word_guess, _ in session.history],
+        "solved": session.solved,
+    }
+
+
+async def play_all(solver, games, concurrency=64):
+    """
+    Plays many games at once on one event loop.
+
+    Args:
+        solver (Solver): Solver handing out a session per game.
+        games (list): Games to play.
+        concurrency (int): Most games in progress at a time.
+
+    Returns:
+        [list]: Result of each game as returned by play, in order.
+    """
+    limit = asyncio.Semaphore(concurrency)
+    # Each game runs at most two blocking calls at a time.
+    with ThreadPoolExecutor(2 * concurrency) as executor:
+
+        async def play_limited(number, game):
+            async with limit:
+                with tracer.context(game=number):
+                    return await play(game, solver.new_session(), executor)
+
+        return await asyncio.gather(
+            *(play_limited(number, game) for number, game in enumerate(games))
+        )
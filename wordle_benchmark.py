@@ -0,0 +1,804 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+from rich import print as rprint
+from rich.table import Table
+
+from wordle_async import BrowserGame, OracleGame, play, play_all
+from wordle_browser import new_chrome
+from wordle_guess_cache import GUESS_CACHE_FILE, GuessCache
+from wordle_openers import (
+    METRICS,
+    RANKING_FILE,
+    print_ranking,
+    rank_openers,
+    save_ranking,
+)
+from wordle_patterns import (
+    ANSWERS_FILE,
+    FREQUENCY_FILE,
+    GUESSES_FILE,
+    WORD_LENGTH,
+    PatternTable,
+    build_cache,
+    default_cache_dir,
+    encode_words,
+    score_blocks,
+    score_guess,
+)
+from wordle_policy import DecisionTree, compile_tree
+from wordle_service import ServiceClient
+from wordle_simulate import (
+    MAX_ROWS,
+    play_boards,
+    play_game,
+    print_guess_cache,
+    summarize,
+    summarize_guess_cache,
+)
+from wordle_sites import LocalAdapter, serve_local_site
+from wordle_solver import Solver
+from wordle_strategy import (
+    STRATEGIES,
+    board_entropies,
+    get_strategy,
+    pattern_entropies,
+)
+from wordle_trace import traced, tracer
+
+# Shared by the games played in each worker process. The pattern matrix is
+# memory-mapped, so its pages are shared between the workers by the OS.
+_solver = None
+
+
+def _init_worker(
+    start_word,
+    strategy_name,
+    strategy_kwargs,
+    use_second_guesses,
+    use_tree,
+    hard_mode,
+    use_guess_cache,
+    guess_cache_file,
+):
+    global _solver
+    table = PatternTable.load()
+    guess_cache = None
+    if use_guess_cache:
+        guess_cache = GuessCache.load(table, guess_cache_file)
+    _solver = Solver(
+        table,
+        get_strategy(strategy_name, **strategy_kwargs),
+        start_word,
+        use_second_guesses,
+        use_tree,
+        hard_mode,
+        guess_cache,
+    )
+
+
+def _play(answer):
+    result = play_game(_solver, answer)
+    guess_cache = _solver.guess_cache
+    if guess_cache is not None:
+        # The running totals of this worker and the picks it has worked out
+        # since its last game, for the parent to add up and save.
+        result["guess_cache"] = {"worker": os.getpid(), **guess_cache.stats()}
+        result["guess_cache_entries"] = guess_cache.take_new()
+    return result
+
+
+def run_benchmark(
+    start_word,
+    strategy_name,
+    strategy_kwargs=None,
+    processes=None,
+    answers=None,
+    use_second_guesses=True,
+    use_tree=False,
+    hard_mode=False,
+    use_guess_cache=False,
+    guess_cache_file=None,
+):
+    """
+    Plays every answer (or the answers given) with the start word and
+    strategy, spreading the games over a pool of worker processes.
+
+    Args:
+        start_word (str): First word entered into every game.
+        strategy_name (str): Name of the strategy picking the later guesses.
+        strategy_kwargs (dict): Extra arguments for the strategy.
+        processes (int): Number of worker processes, all cores if None.
+        answers (list): Answers to play, every answer if None.
+        use_second_guesses (bool): Look up turn two in the second guess table.
+        use_tree (bool): Play from the compiled decision tree, compiling it
+        first if needed.
+        hard_mode (bool): Play in hard mode, without the precomputed tables.
+        use_guess_cache (bool): Score each set of remaining candidates only
+        once per worker.
+        guess_cache_file (str): Start the workers' guess caches from this
+        file and save the picks of the run back to it.
+
+    Returns:
+        [dict]: Summary of the run as returned by summarize.
+    """
+    strategy_kwargs = strategy_kwargs or {}
+    # Build the pattern matrix, second guess table and decision tree once up
+    # front rather than in every worker.
+    table = PatternTable.load()
+    strategy = get_strategy(strategy_name, **strategy_kwargs)
+    Solver(table, strategy, start_word, use_second_guesses, use_tree=False)
+    if (
+        use_tree
+        and not hard_mode
+        and DecisionTree.load(table, strategy, start_word) is None
+    ):
+        compile_tree(table, strategy, start_word, processes)
+    answers = answers or table.answers
+    processes = processes or os.cpu_count() or 1
+    chunksize = max(1, len(answers) // (processes * 8))
+
+    bench_start = time.time()
+    with multiprocessing.Pool(
+        processes,
+        initializer=_init_worker,
+        initargs=(
+            start_word,
+            strategy_name,
+            strategy_kwargs,
+            use_second_guesses,
+            use_tree,
+            hard_mode,
+            use_guess_cache,
+            guess_cache_file,
+        ),
+    ) as pool:
+        results = list(pool.imap_unordered(_play, answers, chunksize))
+    summary = summarize(results, time.time() - bench_start)
+    if use_guess_cache:
+        summary["guess_cache"] = summarize_guess_cache(results)
+        if guess_cache_file:
+            guess_cache = GuessCache.load(table, guess_cache_file)
+            for result in results:
+                guess_cache.update(result["guess_cache_entries"])
+            guess_cache.save(guess_cache_file)
+    summary.update(
+        {
+            "start_word": start_word,
+            "strategy": strategy_name,
+            "strategy_kwargs": strategy_kwargs,
+            "processes": processes,
+            "second_guesses": use_second_guesses and not hard_mode,
+            "tree": use_tree and not hard_mode,
+            "hard_mode": hard_mode,
+        }
+    )
+    return summary
+
+
+def print_summary(summary):
+    rprint(
+        f"Start Word : {summary['start_word']}, Strategy : {summary['strategy']} "
+        f"{summary['strategy_kwargs'] or ''}"
+        f"{' (Hard Mode)' if summary['hard_mode'] else ''}"
+    )
+    for row, count in summary["distribution"].items():
+        rprint(f"{row} : {count}")
+    rprint(f"Failure Rate : {summary['failure_rate'] * 100:.2f} %")
+    rprint(f"Average Guesses : {summary['mean_guesses']:.3f}")
+    rprint(
+        f"Games / Sec : {summary['games_per_sec']:.1f} "
+        f"({summary['processes']} processes, {summary['elapsed']:.2f} Secs)"
+    )
+    if "guess_cache" in summary:
+        print_guess_cache(summary["guess_cache"])
+
+
+def games_command(args):
+    strategy_kwargs = {"prior": args.prior} if args.prior else {}
+    summary = run_benchmark(
+        args.start_word,
+        args.strategy,
+        strategy_kwargs,
+        args.processes,
+        use_second_guesses=not args.no_second_guess,
+        use_tree=args.tree,
+        hard_mode=args.hard,
+        use_guess_cache=args.guess_cache or bool(args.guess_cache_file),
+        guess_cache_file=args.guess_cache_file,
+    )
+    print_summary(summary)
+    with open(args.output, "w") as fh:
+        json.dump(summary, fh, indent=2)
+    rprint(f"Results written to {args.output}")
+
+
+def modes_command(args):
+    summaries = {
+        mode: run_benchmark(
+            args.start_word,
+            args.strategy,
+            processes=args.processes,
+            use_second_guesses=False,
+            hard_mode=mode == "hard",
+        )
+        for mode in ["normal", "hard"]
+    }
+    rprint(
+        f"Start Word : {args.start_word}, Strategy : {args.strategy}, "
+        "every guess scored"
+    )
+    rprint("Mode   : Failure Rate, Average Guesses, Secs")
+    for mode, summary in summaries.items():
+        rprint(
+            f"{mode:<6} : {summary['failure_rate'] * 100:.2f} %, "
+            f"{summary['mean_guesses']:.3f}, {summary['elapsed']:.2f}"
+        )
+    with open(args.output, "w") as fh:
+        json.dump(summaries, fh, indent=2)
+    rprint(f"Results written to {args.output}")
+
+
+def openers_command(args):
+    ranking = rank_openers(args.metric, args.processes, args.strategy, args.top)
+    print_ranking(ranking)
+    save_ranking(ranking, args.output)
+    rprint(f"Ranking written to {args.output}")
+
+
+def tree_command(args):
+    table = PatternTable.load()
+    strategy_kwargs = {"prior": args.prior} if args.prior else {}
+    strategy = get_strategy(args.strategy, **strategy_kwargs)
+    tree, tree_file, stats, elapsed = compile_tree(
+        table, strategy, args.start_word, args.processes
+    )
+    rprint(
+        f"Decision tree for {args.start_word} / {strategy.key} "
+        f"built in {elapsed:.2f} Secs"
+    )
+    rprint(f"Nodes : {stats['nodes']}")
+    rprint(f"Worst Case Guesses : {stats['worst_depth']}")
+    rprint(f"Average Guesses : {stats['average_depth']:.3f}")
+    rprint(f"Answers Needing More Than 6 Guesses : {stats['over_six']}")
+    rprint(f"Tree written to {tree_file}")
+
+
+def async_command(args):
+    solver = Solver(
+        strategy=get_strategy(args.strategy), start_word=args.start_word, use_tree=False
+    )
+    answers = solver.table.answers[: args.games or None]
+    games = [OracleGame(answer, args.reveal_delay) for answer in answers]
+    run_start = time.time()
+    with traced(args.trace):
+        results = asyncio.run(play_all(solver, games, args.concurrency))
+    summary = summarize(
+        [{**result, "answer": game.answer} for game, result in zip(games, results)],
+        time.time() - run_start,
+    )
+    rows = sum(len(result["guesses"]) for result in results)
+    rprint(f"Games Played : {summary['games']}, Solved : {summary['solved']}")
+    rprint(f"Average Guesses : {summary['mean_guesses']:.3f}")
+    rprint(
+        f"Elapsed : {summary['elapsed']:.2f} Secs for {rows} rows revealed in "
+        f"{args.reveal_delay} Secs each ({rows * args.reveal_delay:.0f} Secs "
+        f"one row at a time)"
+    )
+
+
+def browser_command(args):
+    solver = Solver(strategy=get_strategy(args.strategy), start_word=args.start_word)
+    server, base_url = serve_local_site()
+    site = LocalAdapter(base_url, reveal_ms=args.reveal_ms, show_progress=False)
+    driver = new_chrome(headless=not args.show)
+    game = BrowserGame(
+        lambda word, row_number: site.enter_word(driver, word, row_number),
+        lambda row_number: site.reveal_row(driver, row_number),
+    )
+    results = []
+    run_start = time.time()
+    try:
+        with traced(args.trace):
+            for answer in solver.table.answers[: args.games]:
+                with tracer.context(game=answer), tracer.span("game"):
+                    site.open(driver, answer)
+                    result = asyncio.run(play(game, solver.new_session()))
+                results.append({**result, "answer": answer})
+    finally:
+        driver.quit()
+        server.shutdown()
+    summary = summarize(results, time.time() - run_start)
+    rows = sum(len(result["guesses"]) for result in results)
+    rprint(f"Games Played : {summary['games']}, Solved : {summary['solved']}")
+    rprint(f"Average Guesses : {summary['mean_guesses']:.3f}")
+    rprint(
+        f"Average Row : {summary['elapsed'] / max(rows, 1) * 1000:.0f} ms "
+        f"(tiles flip in {args.reveal_ms} ms each, {summary['elapsed']:.2f} Secs)"
+    )
+
+
+def time_scoring(table, boards, repeats=3):
+    """
+    Times one entropy scoring pass over every board at once against one
+    pass per board.
+
+    Returns:
+        [tuple]: Best milliseconds of the batched and the board by board
+        scoring.
+    """
+
+    def best_ms(score):
+        timings = []
+        for _ in range(repeats):
+            score_start = time.perf_counter()
+            score()
+            timings.append((time.perf_counter() - score_start) * 1000)
+        return min(timings)
+
+    batched = best_ms(
+        lambda: board_entropies(table.matrix, boards, num_patterns=table.num_patterns)
+    )
+    board_by_board = best_ms(
+        lambda: sum(
+            pattern_entropies(table.matrix, candidates, num_patterns=table.num_patterns)
+            for candidates in boards
+        )
+    )
+    return batched, board_by_board
+
+
+def boards_command(args):
+    table = PatternTable.load(
+        args.answers_file,
+        args.guesses_file,
+        word_length=args.word_length,
+        show_progress=True,
+    )
+    start_word = args.start_word
+    if start_word not in table.guess_index:
+        entropies = pattern_entropies(
+            table.matrix, table.all_candidates(), num_patterns=table.num_patterns
+        )
+        start_word = table.guesses[int(entropies.argmax())]
+    solver = Solver(
+        table,
+        get_strategy(args.strategy),
+        start_word,
+        use_second_guesses=False,
+        use_tree=False,
+    )
+    rng = np.random.default_rng(args.seed)
+    games = [
+        rng.choice(len(table.answers), args.boards, replace=False).tolist()
+        for _ in range(args.games)
+    ]
+    run_start = time.time()
+    results = [
+        play_boards(solver, [table.answers[idx] for idx in answers])
+        for answers in games
+    ]
+    elapsed = time.time() - run_start
+    max_rows = MAX_ROWS + args.boards - 1
+    summary = summarize(
+        [{**result, "answer": " ".join(result["answers"])} for result in results],
+        elapsed,
+    )
+    rprint(
+        f"{args.boards} Boards of {table.word_length} Letter Words, "
+        f"Start Word : {start_word}, Strategy : {args.strategy}"
+    )
+    rprint(
+        f"Games Played : {summary['games']}, Solved : {summary['solved']} "
+        f"in {max_rows} rows, Boards Solved : "
+        f"{sum(result['boards_solved'] for result in results)}"
+    )
+    rprint(f"Average Guesses : {summary['mean_guesses']:.3f}")
+    rprint(f"Games / Sec : {summary['games_per_sec']:.1f} ({elapsed:.2f} Secs)")
+
+    # Scoring the boards left after the start word, the most costly move.
+    row = table.matrix[table.guess_index[start_word]]
+    timings = [
+        time_scoring(
+            table, [table.all_candidates()[row == row[idx]] for idx in answers]
+        )
+        for answers in games[: args.timed_moves]
+    ]
+    batched, board_by_board = np.mean(timings, axis=0)
+    rprint(
+        f"Second Move Scoring : {batched:.1f} ms for all boards at once, "
+        f"{board_by_board:.1f} ms board by board"
+    )
+
+
+def words_command(args):
+    cache_dir = args.cache_dir or default_cache_dir(args.word_length)
+    build_start = time.time()
+    build_cache(
+        cache_dir,
+        args.answers_file,
+        args.guesses_file,
+        args.frequency_file,
+        args.word_length,
+        show_progress=True,
+    )
+    elapsed = time.time() - build_start
+    table = PatternTable.load(
+        args.answers_file,
+        args.guesses_file,
+        args.frequency_file,
+        cache_dir,
+        args.word_length,
+    )
+    # Kilobytes on Linux.
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    rprint(
+        f"{len(table.answers)} answers and {len(table.guesses)} guesses of "
+        f"{args.word_length} letters compiled to {cache_dir} in {elapsed:.2f} Secs"
+    )
+    rprint(
+        f"Pattern Matrix : {table.matrix.nbytes / 2**20:.1f} MiB on disk, "
+        f"Peak Memory : {peak_rss:.1f} MiB"
+    )
+
+
+def kernel_command(args):
+    table = PatternTable.load()
+    guess_codes = encode_words(table.guesses)
+    answer_codes = encode_words(table.answers)
+    rng = np.random.default_rng(args.seed)
+    sample = rng.choice(len(guess_codes), args.sample_guesses, replace=False)
+
+    timings = []
+    for _ in range(args.repeats):
+        score_start = time.perf_counter()
+        for _ in score_blocks(guess_codes, answer_codes):
+            pass
+        timings.append(time.perf_counter() - score_start)
+    kernel_rate = len(guess_codes) * len(answer_codes) / min(timings)
+    reference_start = time.perf_counter()
+    for guess in [table.guesses[idx] for idx in sample]:
+        for answer in table.answers:
+            score_guess(guess, answer)
+    reference_rate = (
+        len(sample) * len(answer_codes) / (time.perf_counter() - reference_start)
+    )
+    rprint(
+        f"Pattern Matrix : {len(guess_codes)} x {len(answer_codes)} in "
+        f"{min(timings):.2f} Secs"
+    )
+    rprint(
+        f"Patterns / Sec : {kernel_rate:,.0f} vectorized, "
+        f"{reference_rate:,.0f} reference ({kernel_rate / reference_rate:.0f}x)"
+    )
+
+
+async def load_test(host, port, answers, concurrency):
+    """
+    Plays every answer through the solver service, concurrency games at a
+    time, each over its own connection. Each row sends the feedback and
+    then asks for the next word.
+
+    Returns:
+        [tuple]: Milliseconds taken by each request, by endpoint, and the
+        result of each game.
+    """
+    latencies = {"session": [], "feedback": [], "next": []}
+    limit = asyncio.Semaphore(concurrency)
+
+    async def timed(client, endpoint, method, path, payload=None):
+        request_start = time.perf_counter()
+        status, response = await client.request(method, path, payload)
+        latencies[endpoint].append((time.perf_counter() - request_start) * 1000)
+        if status >= 400:
+            raise RuntimeError(f"{method} {path} failed ({status}): {response}")
+        return response
+
+    async def play_service(answer):
+        async with limit:
+            client = ServiceClient(host, port)
+            try:
+                state = await timed(client, "session", "POST", "/session")
+                path = f"/session/{state['id']}"
+                guesses = []
+                while state["next"] is not None and len(guesses) < MAX_ROWS:
+                    word = state["next"]
+                    guesses.append(word)
+                    await timed(
+                        client,
+                        "feedback",
+                        "POST",
+                        f"{path}/feedback",
+                        {"guess": word, "results": score_guess(word, answer)},
+                    )
+                    state = await timed(client, "next", "GET", f"{path}/next")
+                return {"answer": answer, "guesses": guesses, "solved": state["solved"]}
+            finally:
+                await client.close()
+
+    results = await asyncio.gather(*(play_service(answer) for answer in answers))
+    return latencies, results
+
+
+def start_service(*service_args):
+    """
+    Starts wordle_service.py on a free port in its own process.
+
+    Returns:
+        [tuple]: The process and the URL it serves on.
+    """
+    process = subprocess.Popen(
+        [sys.executable, "-u", "wordle_service.py", "--port", "0", *service_args],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    for line in process.stdout:
+        if line.startswith("Serving on"):
+            return process, line.split()[-1]
+    process.wait()
+    raise RuntimeError("The solver service did not start")
+
+
+def service_command(args):
+    process = None
+    url = args.url
+    if not url:
+        process, url = start_service(
+            "--start-word", args.start_word, "--strategy", args.strategy
+        )
+    try:
+        address = urlsplit(url)
+        rng = np.random.default_rng(args.seed)
+        answers = rng.choice(PatternTable.load().answers, args.games).tolist()
+        run_start = time.time()
+        latencies, results = asyncio.run(
+            load_test(address.hostname, address.port, answers, args.concurrency)
+        )
+        elapsed = time.time() - run_start
+        stats = asyncio.run(
+            ServiceClient(address.hostname, address.port).request("GET", "/stats")
+        )[1]
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    summary = summarize(results, elapsed)
+    requests = sum(len(values) for values in latencies.values())
+    rprint(f"Service : {url}, {args.concurrency} games at once")
+    rprint(f"Games Played : {summary['games']}, Solved : {summary['solved']}")
+    rprint(f"Average Guesses : {summary['mean_guesses']:.3f}")
+    rprint(f"Requests / Sec : {requests / elapsed:.0f} ({elapsed:.2f} Secs)")
+    table = Table(title="Latency per Endpoint")
+    for column in ["Endpoint", "Requests", "p50 ms", "p99 ms", "Max ms"]:
+        table.add_column(column, justify="left" if column == "Endpoint" else "right")
+    for endpoint, values in latencies.items():
+        table.add_row(
+            endpoint,
+            str(len(values)),
+            *(f"{value:.1f}" for value in np.percentile(values, [50, 99, 100])),
+        )
+    rprint(table)
+    if stats["guess_cache"] is not None:
+        print_guess_cache(stats["guess_cache"])
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the Wordle solver.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    games = subparsers.add_parser(
+        "games", help="Play every answer in wordle_words.txt with one start word."
+    )
+    games.add_argument("--start-word", default="tizzy")
+    games.add_argument("--strategy", choices=list(STRATEGIES), default="entropy")
+    games.add_argument(
+        "--prior", choices=["uniform", "frequency"], help="Entropy strategy prior."
+    )
+    games.add_argument("--processes", type=int, help="Defaults to all cores.")
+    games.add_argument(
+        "--no-second-guess",
+        action="store_true",
+        help="Score turn two instead of using the precomputed second guesses.",
+    )
+    games.add_argument(
+        "--tree",
+        action="store_true",
+        help="Play from the compiled decision tree for the start word.",
+    )
+    games.add_argument(
+        "--hard",
+        action="store_true",
+        help="Play in hard mode: every guess must use the hints revealed so far.",
+    )
+    games.add_argument(
+        "--guess-cache",
+        action="store_true",
+        help="Remember the pick for each set of remaining candidates.",
+    )
+    games.add_argument(
+        "--guess-cache-file",
+        nargs="?",
+        const=GUESS_CACHE_FILE,
+        metavar="FILE",
+        help=f"Keep the guess cache across runs in FILE ({GUESS_CACHE_FILE}).",
+    )
+    games.add_argument("--output", default="wordle_benchmark.json")
+    games.set_defaults(func=games_command)
+
+    modes = subparsers.add_parser(
+        "modes", help="Compare normal and hard mode over every answer."
+    )
+    modes.add_argument("--start-word", default="tizzy")
+    modes.add_argument("--strategy", choices=list(STRATEGIES), default="entropy")
+    modes.add_argument("--processes", type=int, help="Defaults to all cores.")
+    modes.add_argument("--output", default="wordle_modes.json")
+    modes.set_defaults(func=modes_command)
+
+    openers = subparsers.add_parser(
+        "openers", help="Rank every allowed guess as the opening word."
+    )
+    openers.add_argument("--metric", choices=list(METRICS), default="entropy")
+    openers.add_argument(
+        "--strategy",
+        choices=list(STRATEGIES),
+        default="frequency",
+        help="Strategy used after the opener for the simulated metric.",
+    )
+    openers.add_argument(
+        "--top",
+        type=int,
+        default=100,
+        help="Openers by entropy to simulate for the simulated metric, 0 for all.",
+    )
+    openers.add_argument("--processes", type=int, help="Defaults to all cores.")
+    openers.add_argument("--output", default=RANKING_FILE)
+    openers.set_defaults(func=openers_command)
+
+    tree = subparsers.add_parser(
+        "tree", help="Compile the solving policy for a start word to a tree."
+    )
+    tree.add_argument("--start-word", default="tizzy")
+    tree.add_argument("--strategy", choices=list(STRATEGIES), default="entropy")
+    tree.add_argument(
+        "--prior", choices=["uniform", "frequency"], help="Entropy strategy prior."
+    )
+    tree.add_argument("--processes", type=int, help="Defaults to all cores.")
+    tree.set_defaults(func=tree_command)
+
+    boards = subparsers.add_parser(
+        "boards",
+        help="Play several boards at once with the same guesses, e.g. 4 for "
+        "Quordle, on random answers.",
+    )
+    boards.add_argument("--boards", type=int, default=4)
+    boards.add_argument("--games", type=int, default=100)
+    boards.add_argument(
+        "--start-word",
+        default="tizzy",
+        help="Defaults to the best opener by entropy if not an allowed guess.",
+    )
+    boards.add_argument("--strategy", choices=list(STRATEGIES), default="entropy")
+    boards.add_argument("--word-length", type=int, default=WORD_LENGTH)
+    boards.add_argument("--answers-file", default=ANSWERS_FILE)
+    boards.add_argument("--guesses-file", default=GUESSES_FILE)
+    boards.add_argument("--seed", type=int, default=0)
+    boards.add_argument(
+        "--timed-moves",
+        type=int,
+        default=20,
+        help="Second moves timed batched against board by board.",
+    )
+    boards.set_defaults(func=boards_command)
+
+    words = subparsers.add_parser(
+        "words",
+        help="Compile word lists (plain or gzipped) into the solver's cache, "
+        "reporting time and peak memory.",
+    )
+    words.add_argument("--answers-file", default=ANSWERS_FILE)
+    words.add_argument("--guesses-file", default=GUESSES_FILE)
+    words.add_argument("--frequency-file", default=FREQUENCY_FILE)
+    words.add_argument("--word-length", type=int, default=WORD_LENGTH)
+    words.add_argument(
+        "--cache-dir", help="Defaults to wordle_cache (_<length> if not 5)."
+    )
+    words.set_defaults(func=words_command)
+
+    kernel = subparsers.add_parser(
+        "kernel",
+        help="Time the vectorized feedback in patterns per second against the "
+        "reference scorer.",
+    )
+    kernel.add_argument(
+        "--sample-guesses",
+        type=int,
+        default=100,
+        help="Allowed guesses the reference scorer is timed on, against every "
+        "answer.",
+    )
+    kernel.add_argument("--repeats", type=int, default=3)
+    kernel.add_argument("--seed", type=int, default=0)
+    kernel.set_defaults(func=kernel_command)
+
+    service = subparsers.add_parser(
+        "service",
+        help="Load test the solver service with many games at once, reporting "
+        "p50 and p99 latency.",
+    )
+    service.add_argument(
+        "--url", help="Service to test, e.g. http://127.0.0.1:8080. Started if unset."
+    )
+    service.add_argument("--games", type=int, default=2000)
+    service.add_argument(
+        "--concurrency", type=int, default=1000, help="Games in progress at once."
+    )
+    service.add_argument(
+        "--start-word", default="tizzy", help="Start word of a service started here."
+    )
+    service.add_argument(
+        "--strategy",
+        choices=list(STRATEGIES),
+        default="entropy",
+        help="Strategy of a service started here.",
+    )
+    service.add_argument("--seed", type=int, default=0)
+    service.set_defaults(func=service_command)
+
+    async_games = subparsers.add_parser(
+        "async",
+        help="Play games concurrently on one event loop against boards which "
+        "take time to reveal each row.",
+    )
+    async_games.add_argument("--start-word", default="tizzy")
+    async_games.add_argument("--strategy", choices=list(STRATEGIES), default="entropy")
+    async_games.add_argument(
+        "--games", type=int, default=200, help="Answers to play, 0 for all."
+    )
+    async_games.add_argument(
+        "--reveal-delay",
+        type=float,
+        default=1.5,
+        help="Seconds each row takes to be revealed.",
+    )
+    async_games.add_argument(
+        "--concurrency", type=int, default=64, help="Most games in progress at once."
+    )
+    async_games.add_argument(
+        "--trace", metavar="FILE", help="Save a Chrome trace of each stage."
+    )
+    async_games.set_defaults(func=async_command)
+
+    browser = subparsers.add_parser(
+        "browser",
+        help="Solve the bundled local copy of Wordle in Chrome, end to end.",
+    )
+    browser.add_argument("--start-word", default="tizzy")
+    browser.add_argument("--strategy", choices=list(STRATEGIES), default="entropy")
+    browser.add_argument("--games", type=int, default=20)
+    browser.add_argument(
+        "--reveal-ms", type=int, default=300, help="Flip animation time per tile."
+    )
+    browser.add_argument("--show", action="store_true", help="Show the browser window.")
+    browser.add_argument(
+        "--trace", metavar="FILE", help="Save a Chrome trace of each stage."
+    )
+    browser.set_defaults(func=browser_command)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
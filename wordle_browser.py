@@ -0,0 +1,116 @@
+import logging
+import time
+
+from selenium import webdriver
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+)
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+
+from wordle_trace import tracer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 10
+POLL_FREQUENCY = 0.05
+
+
+def new_chrome(headless=False, detach=False):
+    """
+    Args:
+        headless (bool): Run Chrome without a window.
+        detach (bool): Leave the window open when the script exits.
+
+    Returns:
+        [selenium.webdriver.Chrome]: New Chrome session.
+    """
+    options = webdriver.ChromeOptions()
+    options.add_experimental_option("excludeSwitches", ["enable-logging"])
+    if detach:
+        options.add_experimental_option("detach", True)
+    if headless:
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1280,1024")
+    driver = webdriver.Chrome(options=options)
+    driver.implicitly_wait(5)
+    return driver
+
+
+def reset_page(web_driver):
+    """
+    Clears the cookies and storage of the current site, so the next page
+    loaded starts a fresh game without relaunching the browser.
+    """
+    web_driver.delete_all_cookies()
+    web_driver.execute_script("localStorage.clear(); sessionStorage.clear();")
+
+
+def wait_for(web_driver, condition, description, timeout=DEFAULT_TIMEOUT):
+    """
+    Polls condition until it returns a truthy value, instead of sleeping
+    for a fixed time, and logs how long the page took.
+
+    Args:
+        web_driver (selenium.webdriver): Driver, element or shadow root
+        passed to condition.
+        condition (callable): Called with web_driver, returns a falsy value
+        while the page is not ready yet.
+        description (str): What is being waited for, used in the log.
+        timeout (float): Seconds to wait before raising TimeoutException.
+
+    Returns:
+        The value returned by condition.
+    """
+    wait_start = time.perf_counter()
+    with tracer.span("wait", description=description):
+        value = WebDriverWait(
+            web_driver,
+            timeout,
+            poll_frequency=POLL_FREQUENCY,
+            ignored_exceptions=(NoSuchElementException, StaleElementReferenceException),
+        ).until(condition)
+    logger.info(
+        f"Waited {(time.perf_counter() - wait_start) * 1000:.0f} ms for {description}"
+    )
+    return value
+
+
+def settled(read, is_final):
+    """
+    Builds a wait condition for a value which animates before it settles,
+    e.g. tile colours during the flip animation. The condition is met once
+    the value is final and unchanged between two polls.
+
+    Args:
+        read (callable): Called with the web driver, returns the value.
+        is_final (callable): Returns True if the value is final.
+
+    Returns:
+        [callable]: Condition for wait_for, returning the settled value.
+    """
+    previous = []
+
+    def condition(web_driver):
+        value = read(web_driver)
+        if is_final(value) and previous and previous[-1] == value:
+            return value
+        previous[:] = [value]
+        return None
+
+    return condition
+
+
+def type_word(web_driver, word):
+    """
+    Types word followed by Enter as physical key presses on the focused
+    page, in a single WebDriver call, instead of one lookup and click per
+    on-screen key. Needs no site specific keyboard selectors.
+
+    Args:
+        web_driver (selenium.webdriver): Selenium Webdriver
+        word (str): Word to enter.
+    """
+    ActionChains(web_driver).send_keys(word + Keys.ENTER).perform()
@@ -0,0 +1,188 @@
+import numpy as np
+
+from wordle_patterns import RESULT_CODES, encode_words
+
+ALPHABET_SIZE = 26
+# LetterIndex.filter tests whole bitsets when more than 1 / DENSE_FRACTION
+# of the words are still candidates, else gathers just the candidates.
+DENSE_FRACTION = 8
+
+
+class Constraints:
+    """
+    What a row of results says about the answer:
+    greens - the character known to be at a position,
+    banned - characters known not to be at a position,
+    min_counts - the fewest copies of a character the answer can have,
+    max_counts - the most copies of a character the answer can have.
+
+    Repeated characters need no special cases: a character marked "absent"
+    caps its count at the number of copies marked "correct" or "present".
+    """
+
+    def __init__(self):
+        self.greens = {}
+        self.banned = {}
+        self.min_counts = {}
+        self.max_counts = {}
+
+    @classmethod
+    def from_row(cls, word_guess, row_results):
+        """
+        Args:
+            word_guess (str): Word entered into the puzzle.
+            row_results (list): Result for each character of the row.
+
+        Returns:
+            [Constraints]: Constraints given by the row.
+        """
+        constraints = cls()
+        for idx, (char, result) in enumerate(zip(word_guess, row_results)):
+            if result not in RESULT_CODES:
+                raise ValueError(f"Character {char} at index {idx} has state {result}")
+            if result == "correct":
+                constraints.greens[idx] = char
+            else:
+                constraints.banned.setdefault(idx, set()).add(char)
+        for char in set(word_guess):
+            results = [r for c, r in zip(word_guess, row_results) if c == char]
+            marked = sum(result != "absent" for result in results)
+            constraints.min_counts[char] = marked
+            if "absent" in results:
+                constraints.max_counts[char] = marked
+        return constraints
+
+    def hints(self):
+        """
+        Returns:
+            [Constraints]: Only the greens and the fewest copies of each
+            character, the hints hard mode makes every later guess use.
+        """
+        hints = Constraints()
+        hints.greens = dict(self.greens)
+        hints.min_counts = {
+            char: count for char, count in self.min_counts.items() if count
+        }
+        return hints
+
+    def allows(self, word):
+        """
+        Returns:
+            [bool]: True if the word meets the constraints.
+        """
+        return (
+            all(word[pos] == char for pos, char in self.greens.items())
+            and all(word[pos] not in chars for pos, chars in self.banned.items())
+            and all(word.count(c) >= n for c, n in self.min_counts.items())
+            and all(word.count(c) <= n for c, n in self.max_counts.items())
+        )
+
+    def merge(self, other):
+        """
+        Adds the constraints of another row to these, e.g. to accumulate
+        the constraints of every row of a game.
+
+        Args:
+            other (Constraints): Constraints of the new row.
+
+        Returns:
+            [Constraints]: Only the constraints which are new or tighter
+            than before, all the remaining candidates need checking against.
+        """
+        delta = Constraints()
+        for pos, char in other.greens.items():
+            if self.greens.get(pos) != char:
+                self.greens[pos] = delta.greens[pos] = char
+        for pos, chars in other.banned.items():
+            new_chars = chars - self.banned.get(pos, set())
+            if new_chars:
+                self.banned.setdefault(pos, set()).update(new_chars)
+                delta.banned[pos] = new_chars
+        for char, count in other.min_counts.items():
+            if count > self.min_counts.get(char, 0):
+                self.min_counts[char] = delta.min_counts[char] = count
+        for char, count in other.max_counts.items():
+            if char not in self.max_counts or count < self.max_counts[char]:
+                self.max_counts[char] = delta.max_counts[char] = count
+        return delta
+
+
+def _code(char):
+    return ord(char) - ord("a")
+
+
+class LetterIndex:
+    """
+    Precomputed bitsets (NumPy bool arrays, one bit per word) over a word
+    list, e.g. "has 'a' at position 2" or "contains at least 2 'e'", so that
+    a set of constraints is applied with a handful of AND / AND NOT
+    operations instead of testing every word.
+    """
+
+    def __init__(self, words):
+        codes = encode_words(words)
+        num_words, word_length = codes.shape
+        word_range = np.arange(num_words)
+        # at[pos, char] - words with char at pos.
+        self.at = np.zeros((word_length, ALPHABET_SIZE, num_words), dtype=bool)
+        for pos in range(word_length):
+            self.at[pos, codes[:, pos], word_range] = True
+        # at_least[char, n] - words with at least n copies of char.
+        counts = self.at.sum(axis=0)
+        self.at_least = counts[:, None, :] >= np.arange(word_length + 2)[None, :, None]
+        self.size = num_words
+
+    def apply(self, mask, constraints):
+        """
+        Clears the words which break the constraints.
+
+        Args:
+            mask (numpy.ndarray): Bitset of the words still possible.
+            constraints (Constraints): Constraints to apply.
+
+        Returns:
+            [numpy.ndarray]: Bitset of the words meeting the constraints.
+        """
+        mask = mask.copy()
+        for pos, char in constraints.greens.items():
+            mask &= self.at[pos, _code(char)]
+        for pos, chars in constraints.banned.items():
+            for char in chars:
+                mask &= ~self.at[pos, _code(char)]
+        for char, count in constraints.min_counts.items():
+            if count:
+                mask &= self.at_least[_code(char), count]
+        for char, count in constraints.max_counts.items():
+            mask &= ~self.at_least[_code(char), count + 1]
+        return mask
+
+    def filter(self, candidates, constraints):
+        """
+        Like apply, for the indexes of the words still possible. Each test
+        only looks at the words which passed the ones before, so the cost
+        shrinks with the candidates.
+
+        Args:
+            candidates (numpy.ndarray): Indexes of the words still possible.
+            constraints (Constraints): Constraints to apply.
+
+        Returns:
+            [numpy.ndarray]: Indexes of the words meeting the constraints.
+        """
+        if len(candidates) * DENSE_FRACTION > self.size:
+            # Whole bitsets are cheaper than gathering most of the words.
+            mask = np.zeros(self.size, dtype=bool)
+            mask[candidates] = True
+            return self.apply(mask, constraints).nonzero()[0]
+        # Most selective tests first, so the later ones see fewer words.
+        for pos, char in constraints.greens.items():
+            candidates = candidates[self.at[pos, _code(char)][candidates]]
+        for char, count in constraints.min_counts.items():
+            if count:
+                candidates = candidates[self.at_least[_code(char), count][candidates]]
+        for char, count in constraints.max_counts.items():
+            candidates = candidates[~self.at_least[_code(char), count + 1][candidates]]
+        for pos, chars in constraints.banned.items():
+            for char in chars:
+                candidates = candidates[~self.at[pos, _code(char)][candidates]]
+        return candidates
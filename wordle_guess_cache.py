@@ -0,0 +1,169 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+GUESS_CACHE_FILE = "wordle_guess_cache.json"
+DEFAULT_MAX_ENTRIES = 100_000
+
+
+def fingerprint(indexes, size):
+    """
+    Hashes a set of word indexes through its bitset, so the same set gives
+    the same fingerprint whatever order it was built in.
+
+    Args:
+        indexes (numpy.ndarray): Indexes of the words in the set.
+        size (int): Number of words in the list the indexes point into.
+
+    Returns:
+        [str]: Hex digest of the bitset.
+    """
+    bits = np.zeros(size, dtype=bool)
+    bits[indexes] = True
+    return hashlib.blake2b(np.packbits(bits).tobytes(), digest_size=16).hexdigest()
+
+
+class GuessCache:
+    """
+    Least recently used cache of the word a strategy picks for a set of
+    remaining candidates. Many games reach the same candidates, e.g. after
+    the same opener and feedback, so a batch of games only scores each set
+    once. Keys hold the strategy and, in hard mode, the guesses allowed as
+    well, as both change the pick. The cache can be saved to a JSON file
+    and is discarded on load if the word lists have changed since.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, words_hash=None):
+        self.max_entries = max_entries
+        self.words_hash = words_hash
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Size of the keys and words held, kept up to date by _add.
+        self._entry_bytes = 0
+        # Entries added since take_new was last called.
+        self._new = {}
+        # Sessions may choose words from several threads at once.
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(table, strategy, candidates, guesses=None):
+        """
+        Args:
+            table (PatternTable): Word lists the indexes point into.
+            strategy (Strategy): Strategy picking the word.
+            candidates (numpy.ndarray): Indexes of the remaining answers.
+            guesses (numpy.ndarray): Indexes of the guesses allowed in hard
+            mode, None in normal mode.
+
+        Returns:
+            [str]: Cache key for the pick.
+        """
+        key = f"{strategy.key}/{fingerprint(candidates, len(table.answers))}"
+        if guesses is None:
+            return f"normal/{key}"
+        return f"hard/{key}/{fingerprint(guesses, len(table.guesses))}"
+
+    def get(self, key):
+        """
+        Returns:
+            [str]: Word cached under key, None on a miss.
+        """
+        with self._lock:
+            word = self._entries.get(key)
+            if word is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return word
+
+    def put(self, key, word):
+        with self._lock:
+            self._add(key, word)
+            self._new[key] = word
+
+    def _add(self, key, word):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        self._entries[key] = word
+        self._entry_bytes += sys.getsizeof(key) + sys.getsizeof(word)
+        while len(self._entries) > self.max_entries:
+            old_key, old_word = self._entries.popitem(last=False)
+            self._entry_bytes -= sys.getsizeof(old_key) + sys.getsizeof(old_word)
+
+    def update(self, entries):
+        """
+        Adds entries worked out elsewhere, e.g. by worker processes.
+        """
+        for key, word in entries.items():
+            self.put(key, word)
+
+    def take_new(self):
+        """
+        Returns:
+            [dict]: Entries added since the last call, which are then
+            forgotten, so worker processes can pass them on.
+        """
+        with self._lock:
+            new, self._new = self._new, {}
+            return new
+
+    def memory_bytes(self):
+        """
+        Returns:
+            [int]: Approximate memory held by the entries.
+        """
+        return sys.getsizeof(self._entries) + self._entry_bytes
+
+    def stats(self):
+        """
+        Returns:
+            [dict]: Hits, misses, hit rate, number of entries and memory.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "memory_bytes": self.memory_bytes(),
+        }
+
+    @classmethod
+    def load(cls, table, cache_file=GUESS_CACHE_FILE, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Loads the entries saved in cache_file for the table's word lists.
+
+        Returns:
+            [GuessCache]: The cache, empty if cache_file is missing or was
+            saved for other word lists.
+        """
+        cache = cls(max_entries, table.words_hash)
+        if cache_file and os.path.exists(cache_file):
+            with open(cache_file) as fh:
+                data = json.load(fh)
+            if data["words_hash"] == table.words_hash:
+                for key, word in list(data["entries"].items())[-max_entries:]:
+                    cache._add(key, word)
+            else:
+                logging.warning(f"Guess cache {cache_file} is stale, ignoring it")
+        return cache
+
+    def save(self, cache_file=GUESS_CACHE_FILE):
+        with self._lock:
+            entries = dict(self._entries)
+        with open(cache_file, "w") as fh:
+            json.dump(
+                {"words_hash": self.words_hash, "entries": entries},
+                fh,
+                separators=(",", ":"),
+            )
+        return cache_file
@@ -0,0 +1,168 @@
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+from rich import print as rprint
+
+from wordle_patterns import PatternTable
+from wordle_simulate import MAX_ROWS, play_game
+from wordle_solver import Solver
+from wordle_strategy import expected_remaining, get_strategy, pattern_entropies
+
+RANKING_FILE = "wordle_openers.json"
+
+# Metric name -> True if a higher score is a better opener.
+METRICS = {"entropy": True, "expected": False, "simulated": False}
+
+_table = None
+_solver = None
+
+
+def _init_worker(cache_dir, strategy_name=None):
+    global _table
+    global _solver
+    _table = PatternTable.from_cache(cache_dir)
+    if strategy_name:
+        _solver = Solver(
+            _table,
+            get_strategy(strategy_name),
+            # Every game is played with its own opener.
+            start_word=_table.guesses[0],
+            use_second_guesses=False,
+            use_tree=False,
+        )
+
+
+def _score_rows(job):
+    """
+    Scores the guesses in rows start:stop as openers against every answer.
+    """
+    metric, start, stop = job
+    rows = _table.matrix[start:stop]
+    candidates = _table.all_candidates()
+    num_patterns = _table.num_patterns
+    if metric == "entropy":
+        return start, pattern_entropies(rows, candidates, num_patterns=num_patterns)
+    return start, expected_remaining(rows, candidates, num_patterns)
+
+
+def _simulate_opener(word):
+    """
+    Plays every answer with word as the opener. Failed games count as
+    MAX_ROWS + 1 guesses so an opener cannot gain by giving up.
+    """
+    total = 0
+    for answer in _table.answers:
+        result = play_game(_solver, answer, word)
+        total += len(result["guesses"]) if result["solved"] else MAX_ROWS + 1
+    return word, total / len(_table.answers)
+
+
+def rank_openers(
+    metric="entropy",
+    processes=None,
+    strategy_name="frequency",
+    top=100,
+    rows=512,
+    table=None,
+):
+    """
+    Ranks every allowed guess as the opening word.
+
+    "entropy" and "expected" (expected remaining candidates) are computed
+    from the pattern matrix in blocks of rows spread over a process pool.
+    "simulated" plays every answer with each opener and the given strategy,
+    one opener per task, for the top openers by entropy (all if top is 0).
+
+    Args:
+        metric (str): "entropy", "expected" or "simulated".
+        processes (int): Number of worker processes, all cores if None.
+        strategy_name (str): Strategy used after the opener when simulating.
+        top (int): Number of openers by entropy to simulate.
+        rows (int): Guesses scored per task for the matrix based metrics.
+        table (PatternTable): Word lists to rank, loaded from the default
+        cache if None. The workers load it from its cache directory.
+
+    Returns:
+        [dict]: The ranking, best opener first, and how it was produced.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}', expected one of {list(METRICS)}")
+    table = table or PatternTable.load()
+    processes = processes or os.cpu_count() or 1
+    rank_start = time.time()
+
+    if metric == "simulated":
+        words = table.guesses
+        if top:
+            entropy_ranking = rank_openers("entropy", processes, rows=rows, table=table)
+            words = [entry["word"] for entry in entropy_ranking["ranking"][:top]]
+        with multiprocessing.Pool(
+            processes,
+            initializer=_init_worker,
+            initargs=(table.cache_dir, strategy_name),
+        ) as pool:
+            scored = dict(pool.imap_unordered(_simulate_opener, words))
+    else:
+        jobs = [
+            (metric, start, min(start + rows, len(table.guesses)))
+            for start in range(0, len(table.guesses), rows)
+        ]
+        scores = np.empty(len(table.guesses))
+        with multiprocessing.Pool(
+            processes, initializer=_init_worker, initargs=(table.cache_dir,)
+        ) as pool:
+            for start, block_scores in pool.imap_unordered(_score_rows, jobs):
+                scores[start : start + len(block_scores)] = block_scores
+        scored = dict(zip(table.guesses, scores.tolist()))
+
+    ranked = sorted(scored.items(), key=lambda item: item[1], reverse=METRICS[metric])
+    return {
+        "metric": metric,
+        "strategy": strategy_name if metric == "simulated" else None,
+        "guesses": len(table.guesses),
+        "answers": len(table.answers),
+        "words_hash": table.words_hash,
+        "elapsed": time.time() - rank_start,
+        "ranking": [{"word": word, "score": score} for word, score in ranked],
+    }
+
+
+def save_ranking(ranking, ranking_file=RANKING_FILE):
+    with open(ranking_file, "w") as fh:
+        json.dump(ranking, fh, indent=1)
+
+
+def best_opener(table, default, ranking_file=RANKING_FILE):
+    """
+    Reads the best opener from the cached ranking file.
+
+    Args:
+        table (PatternTable): Word lists the solver is using.
+        default (str): Word returned if there is no usable ranking.
+        ranking_file (str): Ranking written by the openers benchmark.
+
+    Returns:
+        [str]: Best ranked opener, or default.
+    """
+    if not os.path.exists(ranking_file):
+        return default
+    with open(ranking_file) as fh:
+        ranking = json.load(fh)
+    # A ranking of other word lists, even of the same size, is not used.
+    if ranking.get("words_hash") != table.words_hash or not ranking["ranking"]:
+        return default
+    word = ranking["ranking"][0]["word"]
+    return word if word in table.guess_index else default
+
+
+def print_ranking(ranking, count=10):
+    count = min(count, len(ranking["ranking"]))
+    rprint(
+        f"Top {count} openers by {ranking['metric']} "
+        f"({ranking['elapsed']:.2f} Secs)"
+    )
+    for position, entry in enumerate(ranking["ranking"][:count], start=1):
+        rprint(f"{position:>3}. {entry['word']} : {entry['score']:.4f}")
@@ -0,0 +1,666 @@
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+
+import numpy as np
+from rich.progress import Progress
+
+from wordle_trace import tracer
+
+# Feedback for a single character is stored as a base-3 digit:
+# "absent" = 0, "present" = 1, "correct" = 2. The digit for the first
+# character is the least significant one, so a full row of five fits in
+# one uint8 (3**5 = 243 possible patterns). Longer words need a uint16.
+ABSENT, PRESENT, CORRECT = 0, 1, 2
+RESULT_CODES = {"absent": ABSENT, "present": PRESENT, "correct": CORRECT}
+# Characters a row's feedback is typed with, e.g. "gy..g".
+FEEDBACK_CHARS = {"g": "correct", "y": "present", ".": "absent", "-": "absent"}
+WORD_LENGTH = 5
+NUM_PATTERNS = 3**WORD_LENGTH
+ALL_CORRECT = NUM_PATTERNS - 1
+# Up to 10 characters, the most whose patterns fit in a uint16.
+MAX_WORD_LENGTH = 10
+# Characters words may use, coded a = 0 ... z = 25.
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+# Words read from a word list before they are encoded into its array.
+STREAM_CHUNK_WORDS = 1 << 16
+# Guess x answer pairs scored per block of the pattern matrix.
+SCORE_BLOCK_PAIRS = 1 << 18
+
+ANSWERS_FILE = "wordle_words.txt"
+GUESSES_FILE = "wordle_allowed_guesses.txt"
+FREQUENCY_FILE = "words_json.txt"
+# Compiled word lists, frequencies and pattern matrix, rebuilt whenever the
+# source files above change.
+CACHE_DIR = "wordle_cache"
+
+
+def open_word_file(file_name):
+    """
+    Opens a word list for reading as text, decompressing it on the fly if
+    it is gzipped.
+
+    Returns:
+        [tuple]: The text stream and the underlying binary file, whose
+        position tells how much of the file has been read. Both need
+        closing, closing the stream of a gzipped file leaves the file open.
+    """
+    raw = open(file_name, "rb")
+    if raw.peek(2)[:2] == b"\x1f\x8b":
+        binary = gzip.GzipFile(fileobj=raw)
+    else:
+        binary = raw
+    return io.TextIOWrapper(binary, encoding="utf-8", errors="replace"), raw
+
+
+def stream_words(file_name, word_length=WORD_LENGTH, show_progress=False):
+    """
+    Reads the words from the filename (One word per line) provided one
+    line at a time, so a file of any size can be read. The words are
+    stripped of any whitespaces and put in lower case, and only the ones
+    word_length characters long using just the letters a to z are kept,
+    the characters the pattern kernel codes.
+
+    Args:
+        file_name (str): Word list, optionally gzip compressed.
+        word_length (int): Length of the words kept.
+        show_progress (bool): Show a Rich progress bar of the file read.
+
+    Yields:
+        [str]: Each word kept, in file order.
+    """
+    word_pattern = re.compile(f"[{ALPHABET}]{{{word_length}}}")
+    text, raw = open_word_file(file_name)
+    with raw, text, Progress(disable=not show_progress, transient=True) as progress:
+        task = progress.add_task(
+            f"Reading {os.path.basename(file_name)}",
+            total=os.fstat(raw.fileno()).st_size,
+        )
+        for line_number, line in enumerate(text):
+            word = line.strip().lower()
+            if word_pattern.fullmatch(word):
+                yield word
+            if line_number % STREAM_CHUNK_WORDS == 0:
+                progress.update(task, completed=raw.tell())
+
+
+def load_word_codes(file_name, word_length=WORD_LENGTH, show_progress=False):
+    """
+    Streams the words of a word list straight into the compact array the
+    solver uses, a chunk of words at a time, so only the array and one
+    chunk of strings are ever in memory.
+
+    Args:
+        file_name (str): Word list, optionally gzip compressed.
+        word_length (int): Length of the words kept.
+        show_progress (bool): Show a Rich progress bar of the file read.
+
+    Returns:
+        [numpy.ndarray]: (words, word_length) uint8 array of character
+        codes, as encode_words returns.
+    """
+    chunks = []
+    chunk = []
+    for word in stream_words(file_name, word_length, show_progress):
+        chunk.append(word)
+        if len(chunk) == STREAM_CHUNK_WORDS:
+            chunks.append(encode_words(chunk))
+            chunk = []
+    chunks.append(encode_words(chunk, word_length))
+    return np.concatenate(chunks)
+
+
+def pattern_dtype(word_length):
+    """
+    Returns:
+        [numpy.dtype]: Smallest unsigned integer type holding every pattern
+        of a row of word_length characters.
+    """
+    if not 1 <= word_length <= MAX_WORD_LENGTH:
+        raise ValueError(
+            f"Words must be 1 to {MAX_WORD_LENGTH} characters long, "
+            f"not {word_length}"
+        )
+    return np.dtype(np.uint8 if 3**word_length <= 256 else np.uint16)
+
+
+def load_frequencies(file_name=FREQUENCY_FILE):
+    """
+    Loads the Zipf frequency score of each word generated from the WordsAPI.
+
+    Returns:
+        [dict]: Dictionary of word to Zipf frequency score.
+    """
+    with open(file_name, "r") as fh:
+        frequency_dict = json.load(fh)
+    return {
+        word: score
+        for word, score in frequency_dict.items()
+        if isinstance(score, (int, float))
+    }
+
+
+def source_hash(*file_names):
+    """
+    Returns:
+        [str]: Hash of the contents of the files.
+    """
+    digest = hashlib.sha1()
+    for file_name in file_names:
+        with open(file_name, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(block)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def score_guess(guess, answer):
+    """
+    Scores a guess against the answer exactly as Wordle does. Greens are
+    assigned first, then yellows from left to right while the answer still
+    has unmatched copies of that character left over. This is the reference
+    the vectorized feedback_patterns is checked against.
+
+    Args:
+        guess (str): Word entered into the puzzle.
+        answer (str): Solution of the puzzle.
+
+    Returns:
+        [list]: List containing "correct", "present" or "absent" for each
+        character of the guess.
+    """
+    results = ["absent"] * len(guess)
+    unmatched = {}
+    for idx, (g_char, a_char) in enumerate(zip(guess, answer)):
+        if g_char == a_char:
+            results[idx] = "correct"
+        else:
+            unmatched[a_char] = unmatched.get(a_char, 0) + 1
+    for idx, g_char in enumerate(guess):
+        if results[idx] != "correct" and unmatched.get(g_char, 0) > 0:
+            results[idx] = "present"
+            unmatched[g_char] -= 1
+    return results
+
+
+def results_to_pattern(row_results):
+    """
+    Encodes a row of results ("correct", "present", "absent") as the
+    base-3 pattern code used in the pattern matrix.
+
+    Args:
+        row_results (list): Result for each character of the row.
+
+    Returns:
+        [int]: Pattern code between 0 and 242.
+    """
+    pattern = 0
+    for result in reversed(row_results):
+        pattern = pattern * 3 + RESULT_CODES[result]
+    return pattern
+
+
+def parse_feedback(feedback, word_length=WORD_LENGTH):
+    """
+    Reads a row's feedback typed as one character per tile: "g" for green,
+    "y" for yellow and "." or "-" for grey, e.g. "gy..g".
+
+    Args:
+        feedback (str): Typed feedback, in either case.
+        word_length (int): Number of characters in the row.
+
+    Returns:
+        [list]: Result for each character of the row.
+    """
+    feedback = feedback.strip().lower()
+    if len(feedback) != word_length or not set(feedback) <= set(FEEDBACK_CHARS):
+        raise ValueError(
+            f"Feedback must be {word_length} of 'g' (green), 'y' (yellow) and "
+            f"'.' (grey), not '{feedback}'"
+        )
+    return [FEEDBACK_CHARS[char] for char in feedback]
+
+
+def pattern_to_results(pattern, word_length=WORD_LENGTH):
+    """
+    Decodes a base-3 pattern code back to a row of results.
+
+    Args:
+        pattern (int): Pattern code between 0 and 242 (3**word_length - 1).
+        word_length (int): Number of characters in the row.
+
+    Returns:
+        [list]: Result for each character of the row.
+    """
+    names = {code: name for name, code in RESULT_CODES.items()}
+    row_results = []
+    for _ in range(word_length):
+        row_results.append(names[pattern % 3])
+        pattern //= 3
+    return row_results
+
+
+def encode_words(words, word_length=None):
+    """
+    Converts a list of words of the same length into a
+    (len(words), word length) uint8 array of character codes
+    (a = 0 ... z = 25). word_length is only needed if words may be empty.
+    """
+    joined = "".join(words).encode("ascii")
+    codes = np.frombuffer(joined, dtype=np.uint8) - ord("a")
+    if words:
+        word_length = len(words[0])
+    return codes.reshape(len(words), word_length or WORD_LENGTH)
+
+
+def decode_words(codes):
+    """
+    Converts an array of character codes back to fixed width byte strings
+    (numpy "S" dtype) without making a Python string per word.
+    """
+    word_length = codes.shape[1]
+    return np.ascontiguousarray(codes + ord("a")).view(f"S{word_length}").ravel()
+
+
+def word_keys(codes):
+    """
+    Returns:
+        [numpy.ndarray]: int64 key of each row of character codes, equal
+        only for the same word, to compare word lists without strings.
+    """
+    word_length = codes.shape[1]
+    places = len(ALPHABET) ** np.arange(word_length - 1, -1, -1, dtype=np.int64)
+    return codes.astype(np.int64) @ places
+
+
+def letter_counts(codes):
+    """
+    Args:
+        codes (numpy.ndarray): Character codes of the words.
+
+    Returns:
+        [numpy.ndarray]: (26, len(codes)) int8 array of the number of copies
+        of each character in each word.
+    """
+    counts = np.zeros((len(ALPHABET), len(codes)), dtype=np.int8)
+    word_range = np.arange(len(codes))
+    for pos in range(codes.shape[1]):
+        counts[codes[:, pos], word_range] += 1
+    return counts
+
+
+def feedback_patterns(guess_codes, answer_codes, answer_counts=None):
+    """
+    Vectorized score_guess for every guess against every answer, used to
+    build the pattern matrix and to filter candidates by a guess missing
+    from it. Works on whole (guesses, answers) arrays one position at a
+    time instead of walking each word:
+
+    - a position is green if the guess and answer characters match.
+    - the copies of its character available for yellows are the copies in
+      the answer less the ones matched by greens, which are exactly the
+      greens of that character in the guess.
+    - a non-green position is yellow if fewer copies are available than
+      the non-green copies of its character earlier in the guess. Those
+      earlier copies are all yellow in that case, so this is the same as
+      handing out yellows from left to right.
+
+    The per-character terms only involve the guesses repeating the
+    character, so they are computed for those rows alone.
+
+    Args:
+        guess_codes (numpy.ndarray): Character codes of the guesses.
+        answer_codes (numpy.ndarray): Character codes of the answers.
+        answer_counts (numpy.ndarray): letter_counts of the answers,
+        computed if None.
+
+    Returns:
+        [numpy.ndarray]: (len(guess_codes), len(answer_codes)) array of
+        pattern codes, of the pattern_dtype of the word length.
+    """
+    num_guesses, word_length = guess_codes.shape
+    dtype = pattern_dtype(word_length).type
+    if answer_counts is None:
+        answer_counts = letter_counts(answer_codes)
+    greens = [
+        guess_codes[:, pos, None] == answer_codes[None, :, pos]
+        for pos in range(word_length)
+    ]
+    patterns = np.zeros((num_guesses, len(answer_codes)), dtype=dtype)
+    for pos in range(word_length):
+        char = guess_codes[:, pos]
+        available = answer_counts[char]
+        available -= greens[pos]
+        earlier = np.zeros_like(available)
+        for other in range(word_length):
+            if other == pos:
+                continue
+            rows = (guess_codes[:, other] == char).nonzero()[0]
+            if not len(rows):
+                continue
+            available[rows] -= greens[other][rows]
+            if other < pos:
+                earlier[rows] += ~greens[other][rows]
+        yellow = ~greens[pos] & (earlier < available)
+        digit = greens[pos].view(np.uint8) * np.uint8(CORRECT)
+        digit |= yellow.view(np.uint8)
+        digit = digit.astype(dtype, copy=False)
+        digit *= dtype(3**pos)
+        patterns += digit
+    return patterns
+
+
+def score_blocks(guess_codes, answer_codes, block_size=None):
+    """
+    Scores the guesses against every answer a block of guesses at a time.
+
+    Args:
+        guess_codes (numpy.ndarray): Character codes of the guesses.
+        answer_codes (numpy.ndarray): Character codes of the answers.
+        block_size (int): Number of guesses scored per vectorized block,
+        about SCORE_BLOCK_PAIRS pairs' worth if None.
+
+    Yields:
+        [tuple]: Index of the first guess in the block and its
+        (block rows, len(answer_codes)) patterns.
+    """
+    block_size = block_size or max(1, SCORE_BLOCK_PAIRS // max(len(answer_codes), 1))
+    answer_counts = letter_counts(answer_codes)
+    for start in range(0, len(guess_codes), block_size):
+        stop = start + block_size
+        yield start, feedback_patterns(
+            guess_codes[start:stop], answer_codes, answer_counts
+        )
+
+
+def save_pattern_matrix(file_name, guess_codes, answer_codes, show_progress=False):
+    """
+    Writes the pattern matrix to a .npy file a block at a time, so it is
+    never held in memory whole.
+    """
+    dtype = pattern_dtype(guess_codes.shape[1])
+    header = {
+        "descr": np.lib.format.dtype_to_descr(dtype),
+        "fortran_order": False,
+        "shape": (len(guess_codes), len(answer_codes)),
+    }
+    with open(file_name, "wb") as fh, Progress(
+        disable=not show_progress, transient=True
+    ) as progress:
+        task = progress.add_task("Scoring guesses", total=len(guess_codes))
+        np.lib.format.write_array_header_1_0(fh, header)
+        for start, block in score_blocks(guess_codes, answer_codes):
+            fh.write(block.tobytes())
+            progress.update(task, completed=start + len(block))
+
+
+def match_frequencies(words, frequency_dict):
+    """
+    Looks up the frequency score of each word without a Python string per
+    word, by searching the sorted words of the frequency file.
+
+    Args:
+        words (numpy.ndarray): Words as fixed width byte strings.
+        frequency_dict (dict): Word to Zipf frequency score.
+
+    Returns:
+        [numpy.ndarray]: Frequency score of each word, 0 for words without
+        one.
+    """
+    width = words.dtype.itemsize
+    known = sorted(
+        (word.encode("ascii"), score)
+        for word, score in frequency_dict.items()
+        if len(word) == width and word.isascii()
+    )
+    if not known:
+        return np.zeros(len(words))
+    known_words = np.array([word for word, _ in known], dtype=words.dtype)
+    scores = np.array([score for _, score in known], dtype=np.float64)
+    positions = np.searchsorted(known_words, words).clip(max=len(known) - 1)
+    return np.where(known_words[positions] == words, scores[positions], 0.0)
+
+
+def default_cache_dir(word_length=WORD_LENGTH):
+    """
+    Returns:
+        [str]: wordle_cache, with the word length appended for words other
+        than five letters long.
+    """
+    if word_length == WORD_LENGTH:
+        return CACHE_DIR
+    return f"{CACHE_DIR}_{word_length}"
+
+
+def build_cache(
+    cache_dir=CACHE_DIR,
+    answers_file=ANSWERS_FILE,
+    guesses_file=GUESSES_FILE,
+    frequency_file=FREQUENCY_FILE,
+    word_length=WORD_LENGTH,
+    show_progress=False,
+):
+    """
+    Compiles the word_length character words of the word lists, the
+    frequency score of each word and the pattern matrix into .npy files in
+    cache_dir, along with a hash of the source files they were built from.
+    The word lists (plain or gzipped) are streamed into arrays of character
+    codes and the pattern matrix is written to its file a block at a time,
+    so large dictionaries build in bounded memory.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    answer_codes = load_word_codes(
+        answers_file, word_length, show_progress=show_progress
+    )
+    if not len(answer_codes):
+        raise ValueError(f"No {word_length} letter words in {answers_file}")
+    guess_codes = load_word_codes(
+        guesses_file, word_length, show_progress=show_progress
+    )
+    # Large dictionaries often hold the answers too. Each word is kept once,
+    # the answers after the other guesses.
+    guess_keys = word_keys(guess_codes)
+    _, first = np.unique(guess_keys, return_index=True)
+    first.sort()
+    first = first[~np.isin(guess_keys[first], word_keys(answer_codes))]
+    guess_codes = np.concatenate([guess_codes[first], answer_codes])
+    guesses = decode_words(guess_codes)
+    arrays = {
+        "guesses": guesses,
+        "answers": decode_words(answer_codes),
+        "guess_frequencies": match_frequencies(
+            guesses, load_frequencies(frequency_file)
+        ),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(cache_dir, f"{name}.npy"), array)
+    save_pattern_matrix(
+        os.path.join(cache_dir, "patterns.npy"),
+        guess_codes,
+        answer_codes,
+        show_progress,
+    )
+    with open(os.path.join(cache_dir, "source.json"), "w") as fh:
+        json.dump(
+            {
+                "source_hash": source_hash(answers_file, guesses_file, frequency_file),
+                "word_length": word_length,
+            },
+            fh,
+        )
+
+
+class PatternTable:
+    """
+    Holds the guess and answer word lists, the frequency score of each word
+    and the precomputed pattern matrix, so that filtering candidates after a
+    guess is a single row lookup and compare. Every word has the same
+    length, five letters for Wordle.
+    """
+
+    def __init__(self, guesses, answers, matrix, guess_frequencies=None):
+        self.guesses = guesses
+        self.answers = answers
+        self.matrix = matrix
+        # Directory the table was loaded from, None if built in memory.
+        self.cache_dir = None
+        self.word_length = len(answers[0])
+        self.num_patterns = 3**self.word_length
+        self.all_correct = self.num_patterns - 1
+        self.guess_index = {word: idx for idx, word in enumerate(guesses)}
+        self.answer_index = {word: idx for idx, word in enumerate(answers)}
+        if guess_frequencies is None:
+            guess_frequencies = np.zeros(len(guesses))
+        self.guess_frequencies = guess_frequencies
+        self.answer_frequencies = guess_frequencies[
+            [self.guess_index[word] for word in answers]
+        ]
+        self._words_hash = None
+        # Built here rather than on first use, as sessions on several
+        # threads may score a guess missing from the matrix at once.
+        self._answer_codes = encode_words(answers)
+        self._answer_counts = letter_counts(self._answer_codes)
+
+    @classmethod
+    def load(
+        cls,
+        answers_file=ANSWERS_FILE,
+        guesses_file=GUESSES_FILE,
+        frequency_file=FREQUENCY_FILE,
+        cache_dir=None,
+        word_length=WORD_LENGTH,
+        show_progress=False,
+    ):
+        """
+        Memory-maps the compiled word lists, frequencies and pattern matrix
+        from cache_dir, compiling them first if they are missing or the
+        source files have changed since.
+
+        Args:
+            word_length (int): Only words of this length are loaded.
+            cache_dir (str): Defaults to wordle_cache, with the word length
+            appended for words other than five letters long.
+            show_progress (bool): Show progress bars while compiling.
+
+        Returns:
+            [PatternTable]: Table for the allowed guesses and answers.
+        """
+        cache_dir = cache_dir or default_cache_dir(word_length)
+        with tracer.span("load_words"):
+            sources = (answers_file, guesses_file, frequency_file)
+            source_file = os.path.join(cache_dir, "source.json")
+            source = None
+            if os.path.exists(source_file):
+                with open(source_file) as fh:
+                    source = json.load(fh)
+            expected = {
+                "source_hash": source_hash(*sources),
+                "word_length": word_length,
+            }
+            if source != expected:
+                if source is not None:
+                    logging.warning(f"Word cache {cache_dir} is stale, rebuilding")
+                build_cache(cache_dir, *sources, word_length, show_progress)
+            return cls.from_cache(cache_dir)
+
+    @classmethod
+    def from_cache(cls, cache_dir):
+        """
+        Memory-maps a cache compiled by load without checking it against
+        its source files, e.g. in worker processes of a pool.
+
+        Returns:
+            [PatternTable]: Table for the cached word lists.
+        """
+
+        def cached(name):
+            return np.load(os.path.join(cache_dir, f"{name}.npy"), mmap_mode="r")
+
+        table = cls(
+            np.char.decode(cached("guesses"), "ascii").tolist(),
+            np.char.decode(cached("answers"), "ascii").tolist(),
+            cached("patterns"),
+            cached("guess_frequencies"),
+        )
+        table.cache_dir = cache_dir
+        return table
+
+    @property
+    def words_hash(self):
+        """
+        Returns:
+            [str]: Hash of the guess and answer word lists, used to detect
+            tables built from different word lists.
+        """
+        if self._words_hash is None:
+            digest = hashlib.sha1()
+            digest.update("\n".join(self.guesses).encode())
+            digest.update(b"|")
+            digest.update("\n".join(self.answers).encode())
+            self._words_hash = digest.hexdigest()
+        return self._words_hash
+
+    def all_candidates(self):
+        """
+        Returns:
+            [numpy.ndarray]: Indexes of every answer word.
+        """
+        return np.arange(len(self.answers))
+
+    def all_guesses(self):
+        """
+        Returns:
+            [numpy.ndarray]: Indexes of every allowed guess.
+        """
+        return np.arange(len(self.guesses))
+
+    def filter(self, candidates, word_guess, row_results):
+        """
+        Keeps only the candidates which would have produced row_results
+        for word_guess.
+
+        Args:
+            candidates (numpy.ndarray): Indexes of the remaining answers.
+            word_guess (str): Word entered into the puzzle.
+            row_results (list): Result for each character of the row.
+
+        Returns:
+            [numpy.ndarray]: Indexes of the answers still possible.
+        """
+        row = self.patterns(word_guess, candidates)
+        return candidates[row == results_to_pattern(row_results)]
+
+    def patterns(self, word_guess, candidates):
+        """
+        Looks up the feedback word_guess gets from each candidate in the
+        pattern matrix, or scores it with feedback_patterns if word_guess
+        is not one of the allowed guesses.
+
+        Args:
+            word_guess (str): Word entered into the puzzle.
+            candidates (numpy.ndarray): Indexes of the remaining answers.
+
+        Returns:
+            [numpy.ndarray]: Pattern code for each candidate.
+        """
+        idx = self.guess_index.get(word_guess)
+        if idx is not None:
+            return self.matrix[idx][candidates]
+        if not re.fullmatch(f"[{ALPHABET}]{{{self.word_length}}}", word_guess):
+            raise ValueError(f"'{word_guess}' is not a {self.word_length} letter word")
+        return feedback_patterns(
+            encode_words([word_guess]),
+            self._answer_codes[candidates],
+            self._answer_counts[:, candidates],
+        )[0]
+
+    def words(self, candidates):
+        """
+        Returns:
+            [list]: Answer words for the candidate indexes.
+        """
+        return [self.answers[idx] for idx in candidates]
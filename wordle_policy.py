@@ -0,0 +1,313 @@
+import json
+import logging
+import multiprocessing
+import os
+import time
+
+from wordle_patterns import PatternTable, results_to_pattern
+
+SECOND_GUESS_FILE = "wordle_second_guess.json"
+TREE_FILE = "wordle_tree_{opener}_{strategy}.json"
+
+
+def build_second_guesses(table, strategy, opener):
+    """
+    Works out the strategy's second guess for every feedback pattern the
+    opener can produce.
+
+    Args:
+        table (PatternTable): Word lists and pattern matrix.
+        strategy (Strategy): Strategy picking the second guess.
+        opener (str): First word entered into the puzzle.
+
+    Returns:
+        [list]: Second guess for each feedback pattern, None where the
+        pattern cannot occur or the opener was the answer.
+    """
+    row = table.matrix[table.guess_index[opener]]
+    candidates = table.all_candidates()
+    second_guesses = [None] * table.num_patterns
+    for pattern in set(row.tolist()) - {table.all_correct}:
+        second_guesses[pattern] = strategy.choose(table, candidates[row == pattern])
+    return second_guesses
+
+
+class SecondGuessTable:
+    """
+    Second guess for each feedback pattern of a fixed opener, so turn two
+    is a lookup instead of a full candidate scan. Tables are cached in a
+    JSON file keyed by opener and strategy, and rebuilt when the word lists
+    change.
+    """
+
+    def __init__(self, opener, strategy_key, words_hash, second_guesses):
+        self.opener = opener
+        self.strategy_key = strategy_key
+        self.words_hash = words_hash
+        self.second_guesses = second_guesses
+
+    @staticmethod
+    def _entry_key(opener, strategy_key):
+        return f"{opener}/{strategy_key}"
+
+    @classmethod
+    def load(cls, table, strategy, opener, table_file=SECOND_GUESS_FILE):
+        """
+        Loads the table for the opener and strategy from table_file,
+        building and saving it first if it is missing or out of date.
+
+        Args:
+            table (PatternTable): Word lists and pattern matrix.
+            strategy (Strategy): Strategy picking the second guess.
+            opener (str): First word entered into the puzzle.
+            table_file (str): JSON file holding the cached tables.
+
+        Returns:
+            [SecondGuessTable]: Second guesses for the opener.
+        """
+        entries = {}
+        if os.path.exists(table_file):
+            with open(table_file) as fh:
+                entries = json.load(fh)
+        key = cls._entry_key(opener, strategy.key)
+        entry = entries.get(key)
+        if entry is None or entry["words_hash"] != table.words_hash:
+            logging.info(f"Building second guess table for {key}")
+            entry = {
+                "words_hash": table.words_hash,
+                "second_guesses": build_second_guesses(table, strategy, opener),
+            }
+            entries[key] = entry
+            with open(table_file, "w") as fh:
+                json.dump(entries, fh)
+        return cls(opener, strategy.key, entry["words_hash"], entry["second_guesses"])
+
+    def lookup(self, row_results):
+        """
+        Args:
+            row_results (list): Result for each character of the opener.
+
+        Returns:
+            [str]: Second guess for the feedback, None if there is none.
+        """
+        return self.second_guesses[results_to_pattern(row_results)]
+
+
+def build_subtree(table, strategy, candidates, guess):
+    """
+    Compiles the strategy's play from guess onwards into a tree node.
+
+    Args:
+        table (PatternTable): Word lists and pattern matrix.
+        strategy (Strategy): Strategy picking each guess.
+        candidates (numpy.ndarray): Indexes of the answers still possible.
+        guess (str): Word entered at this node.
+
+    Returns:
+        [dict]: Node with the guess under "guess" and, unless the guess is
+        the only candidate left, a child node for each feedback pattern
+        under "children".
+    """
+    node = {"guess": guess}
+    row = table.matrix[table.guess_index[guess]][candidates]
+    children = {}
+    for pattern in set(row.tolist()) - {table.all_correct}:
+        remaining = candidates[row == pattern]
+        next_guess = strategy.choose(table, remaining)
+        children[str(pattern)] = build_subtree(table, strategy, remaining, next_guess)
+    if children:
+        node["children"] = children
+    return node
+
+
+_table = None
+_strategy = None
+
+
+def _init_worker(cache_dir, strategy):
+    global _table
+    global _strategy
+    _table = PatternTable.from_cache(cache_dir)
+    _strategy = strategy
+
+
+def _build_branch(job, table=None, strategy=None):
+    """
+    Builds the subtree below one feedback of the opener, with the worker's
+    table and strategy unless others are given.
+    """
+    table = table or _table
+    strategy = strategy or _strategy
+    pattern, candidates = job
+    guess = strategy.choose(table, candidates)
+    return pattern, build_subtree(table, strategy, candidates, guess)
+
+
+class DecisionTree:
+    """
+    The whole solving policy of a strategy for a fixed opener, compiled to
+    a tree of feedback pattern -> next guess down to the solution. Playing
+    from the tree needs no scoring at all.
+    """
+
+    def __init__(self, opener, strategy_key, words_hash, root):
+        self.opener = opener
+        self.strategy_key = strategy_key
+        self.words_hash = words_hash
+        self.root = root
+
+    @staticmethod
+    def file_name(opener, strategy_key):
+        return TREE_FILE.format(opener=opener, strategy=strategy_key.replace(":", "_"))
+
+    @classmethod
+    def build(cls, table, strategy, opener, processes=None):
+        """
+        Compiles the tree, building each first level branch in a separate
+        task on a process pool.
+
+        Args:
+            table (PatternTable): Word lists and pattern matrix. The workers
+            load it from its cache directory, so a table built in memory is
+            compiled in this process instead.
+            strategy (Strategy): Strategy picking each guess after the opener.
+            opener (str): First word entered into the puzzle.
+            processes (int): Number of worker processes, all cores if None.
+
+        Returns:
+            [DecisionTree]: Compiled tree.
+        """
+        candidates = table.all_candidates()
+        row = table.matrix[table.guess_index[opener]]
+        jobs = [
+            (pattern, candidates[row == pattern])
+            for pattern in set(row.tolist()) - {table.all_correct}
+        ]
+        # Largest branches first so they do not end up running last.
+        jobs.sort(key=lambda job: len(job[1]), reverse=True)
+        root = {"guess": opener, "children": {}}
+        if table.cache_dir is None:
+            for job in jobs:
+                pattern, subtree = _build_branch(job, table, strategy)
+                root["children"][str(pattern)] = subtree
+            return cls(opener, strategy.key, table.words_hash, root)
+        with multiprocessing.Pool(
+            processes or os.cpu_count() or 1,
+            initializer=_init_worker,
+            initargs=(table.cache_dir, strategy),
+        ) as pool:
+            for pattern, subtree in pool.imap_unordered(_build_branch, jobs):
+                root["children"][str(pattern)] = subtree
+        return cls(opener, strategy.key, table.words_hash, root)
+
+    @classmethod
+    def load(cls, table, strategy, opener, tree_file=None):
+        """
+        Loads the compiled tree for the opener and strategy.
+
+        Returns:
+            [DecisionTree]: The tree, or None if it has not been built for
+            these word lists.
+        """
+        tree_file = tree_file or cls.file_name(opener, strategy.key)
+        if not os.path.exists(tree_file):
+            return None
+        with open(tree_file) as fh:
+            data = json.load(fh)
+        if data["words_hash"] != table.words_hash:
+            logging.warning(f"Decision tree {tree_file} is stale, ignoring it")
+            return None
+        return cls(opener, strategy.key, data["words_hash"], data["root"])
+
+    def save(self, tree_file=None):
+        tree_file = tree_file or self.file_name(self.opener, self.strategy_key)
+        with open(tree_file, "w") as fh:
+            json.dump(
+                {
+                    "opener": self.opener,
+                    "strategy": self.strategy_key,
+                    "words_hash": self.words_hash,
+                    "root": self.root,
+                },
+                fh,
+                separators=(",", ":"),
+            )
+        return tree_file
+
+    def walk(self):
+        """
+        Returns:
+            [TreeWalker]: Cursor starting at the opener for a new game.
+        """
+        return TreeWalker(self.root)
+
+    def stats(self, table):
+        """
+        Plays every answer down the tree to measure its depth.
+
+        Returns:
+            [dict]: Number of nodes, worst case and average number of guesses
+            and the number of answers needing more than six guesses.
+        """
+        depths = []
+        for answer in table.answers:
+            node = self.root
+            depth = 1
+            while node["guess"] != answer:
+                pattern = table.matrix[table.guess_index[node["guess"]]][
+                    table.answer_index[answer]
+                ]
+                node = node["children"][str(pattern)]
+                depth += 1
+            depths.append(depth)
+        nodes = 0
+        pending = [self.root]
+        while pending:
+            node = pending.pop()
+            nodes += 1
+            pending.extend(node.get("children", {}).values())
+        return {
+            "nodes": nodes,
+            "worst_depth": max(depths),
+            "average_depth": sum(depths) / len(depths),
+            "over_six": sum(depth > 6 for depth in depths),
+        }
+
+
+class TreeWalker:
+    """
+    Position in a DecisionTree during one game.
+    """
+
+    def __init__(self, root):
+        self.node = root
+
+    def next_guess(self, row_results):
+        """
+        Moves down the tree along the feedback for the current guess.
+
+        Args:
+            row_results (list): Result for each character of the last guess.
+
+        Returns:
+            [str]: Next guess, None if the feedback is not in the tree.
+        """
+        if self.node is None:
+            return None
+        pattern = str(results_to_pattern(row_results))
+        self.node = self.node.get("children", {}).get(pattern)
+        return None if self.node is None else self.node["guess"]
+
+
+def compile_tree(table, strategy, opener, processes=None):
+    """
+    Builds, saves and measures the decision tree for the opener.
+
+    Returns:
+        [tuple]: The tree, the file it was saved to, its stats and the
+        build time in seconds.
+    """
+    build_start = time.time()
+    tree = DecisionTree.build(table, strategy, opener, processes)
+    elapsed = time.time() - build_start
+    return tree, tree.save(), tree.stats(table), elapsed
@@ -0,0 +1,424 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+from rich import print as rprint
+
+from wordle_guess_cache import GuessCache
+from wordle_openers import best_opener
+from wordle_patterns import RESULT_CODES, PatternTable
+from wordle_solver import Solver
+from wordle_strategy import STRATEGIES, get_strategy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_MAX_SESSIONS = 100_000
+# Seconds a game can be left idle before it is dropped.
+DEFAULT_SESSION_TTL = 3600
+# Connections waiting to be accepted, enough for thousands of clients
+# connecting at once.
+BACKLOG = 4096
+MAX_BODY_BYTES = 1 << 16
+
+
+class ServiceError(Exception):
+    """
+    An error sent back to the client as {"error": message} with status.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class _Game:
+    """
+    A game being played through the service. Its requests are taken one
+    at a time, so two rows never update the session at once.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+
+class SolverService:
+    """
+    Keeps a Solver loaded, with its word lists, pattern matrix and tables
+    warm, and plays any number of games for clients over a local HTTP/JSON
+    API:
+
+    POST /session - starts a game, optionally {"start_word": word}.
+    POST /session/{id}/feedback - {"guess": word, "results": [...]} with
+    "correct", "present" or "absent" for each character. guess defaults to
+    the word suggested last.
+    GET /session/{id}/next - the word to enter next.
+    GET /stats - number of games and the guess cache statistics.
+
+    Every game answers with its id, the next word (null once solved),
+    whether it is solved, the number of answers still possible and the
+    guesses so far. Requests are parsed on one event loop and the solver's
+    work runs on a thread pool, so slow scoring does not hold up the other
+    games. Games left idle for session_ttl seconds, or the least recently
+    used ones past max_sessions, are dropped.
+    """
+
+    def __init__(
+        self,
+        solver,
+        max_sessions=DEFAULT_MAX_SESSIONS,
+        session_ttl=DEFAULT_SESSION_TTL,
+        executor=None,
+    ):
+        """
+        Args:
+            solver (Solver): Solver shared by every game.
+            max_sessions (int): Most games kept at once.
+            session_ttl (float): Seconds a game can be left idle.
+            executor (concurrent.futures.Executor): Runs the solver's work,
+            a thread pool if None.
+        """
+        self.solver = solver
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self.executor = executor or ThreadPoolExecutor()
+        self._games = OrderedDict()
+
+    def _new_game(self, start_word):
+        now = time.monotonic()
+        while self._games and (
+            len(self._games) >= self.max_sessions
+            or now - next(iter(self._games.values())).last_used > self.session_ttl
+        ):
+            self._games.popitem(last=False)
+        session_id = uuid.uuid4().hex
+        game = self._games[session_id] = _Game(self.solver.new_session(start_word))
+        return session_id, game
+
+    def _game(self, session_id):
+        game = self._games.get(session_id)
+        now = time.monotonic()
+        if game is not None and now - game.last_used > self.session_ttl:
+            del self._games[session_id]
+            game = None
+        if game is None:
+            raise ServiceError(HTTPStatus.NOT_FOUND, f"No session '{session_id}'")
+        game.last_used = now
+        self._games.move_to_end(session_id)
+        return game
+
+    @staticmethod
+    def state(session_id, session):
+        """
+        Returns:
+            [dict]: What the client is told about a game.
+        """
+        return {
+            "id": session_id,
+            "next": session.next_word,
+            "solved": session.solved,
+            "remaining": len(session.candidates),
+            "guesses": [word_guess for word_guess, _ in session.history],
+        }
+
+    def create(self, body):
+        start_word = body.get("start_word")
+        if start_word is not None:
+            if not isinstance(start_word, str):
+                raise ServiceError(HTTPStatus.BAD_REQUEST, "start_word must be a word")
+            start_word = start_word.lower()
+        if start_word is not None and start_word not in self.solver.table.guess_index:
+            raise ServiceError(
+                HTTPStatus.BAD_REQUEST, f"'{start_word}' is not in the allowed guesses"
+            )
+        session_id, game = self._new_game(start_word)
+        return HTTPStatus.CREATED, self.state(session_id, game.session)
+
+    async def feedback(self, session_id, body):
+        game = self._game(session_id)
+        row_results = body.get("results")
+        word_length = self.solver.table.word_length
+        if (
+            not isinstance(row_results, list)
+            or len(row_results) != word_length
+            or not all(result in RESULT_CODES for result in row_results)
+        ):
+            raise ServiceError(
+                HTTPStatus.BAD_REQUEST,
+                f"results must list {word_length} of {', '.join(RESULT_CODES)}",
+            )
+        async with game.lock:
+            session = game.session
+            if session.next_word is None:
+                raise ServiceError(HTTPStatus.CONFLICT, "The puzzle is already solved")
+            word_guess = body.get("guess") or session.next_word
+            if not isinstance(word_guess, str):
+                raise ServiceError(HTTPStatus.BAD_REQUEST, "guess must be a word")
+            word_guess = word_guess.lower()
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(
+                    self.executor, session.update, word_guess, row_results
+                )
+            except ValueError as e:
+                # The session is left as it was, so the row can be resent.
+                raise ServiceError(HTTPStatus.UNPROCESSABLE_ENTITY, str(e))
+        return HTTPStatus.OK, self.state(session_id, session)
+
+    async def next_word(self, session_id):
+        game = self._game(session_id)
+        # Waits for a row being scored, whose word is already in the history.
+        async with game.lock:
+            return HTTPStatus.OK, self.state(session_id, game.session)
+
+    def stats(self):
+        guess_cache = self.solver.guess_cache
+        return HTTPStatus.OK, {
+            "sessions": len(self._games),
+            "guess_cache": guess_cache.stats() if guess_cache is not None else None,
+        }
+
+    async def dispatch(self, method, target, body):
+        """
+        Routes a request to its handler.
+
+        Args:
+            method (str): HTTP method.
+            target (str): Request target, e.g. "/session/<id>/next".
+            body (bytes): Request body, JSON if not empty.
+
+        Returns:
+            [tuple]: HTTP status and the JSON payload of the response.
+        """
+        parts = urlsplit(target).path.strip("/").split("/")
+        if parts == ["stats"]:
+            routes = {"GET": self.stats}
+        elif parts == ["session"]:
+            routes = {"POST": lambda: self.create(self._json(body))}
+        elif len(parts) == 3 and parts[0] == "session" and parts[2] == "feedback":
+            routes = {"POST": lambda: self.feedback(parts[1], self._json(body))}
+        elif len(parts) == 3 and parts[0] == "session" and parts[2] == "next":
+            routes = {"GET": lambda: self.next_word(parts[1])}
+        else:
+            raise ServiceError(HTTPStatus.NOT_FOUND, f"No route for {target}")
+        if method not in routes:
+            raise ServiceError(
+                HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not allowed on {target}"
+            )
+        response = routes[method]()
+        if asyncio.iscoroutine(response):
+            response = await response
+        return response
+
+    @staticmethod
+    def _json(body):
+        if not body:
+            return {}
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON")
+        if not isinstance(payload, dict):
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+        return payload
+
+    async def handle(self, reader, writer):
+        """
+        Serves the requests of one connection, kept open between requests
+        unless the client asks to close it.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                keep_alive = False
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if not line.strip():
+                            break
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                    length = int(headers.get("content-length", 0))
+                    if length > MAX_BODY_BYTES:
+                        raise ServiceError(
+                            HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Body is too large"
+                        )
+                    body = await reader.readexactly(length)
+                    keep_alive = (
+                        version == "HTTP/1.1"
+                        and headers.get("connection", "").lower() != "close"
+                    )
+                    status, payload = await self.dispatch(method, target, body)
+                except ServiceError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except ValueError:
+                    status, payload = HTTPStatus.BAD_REQUEST, {"error": "Bad request"}
+                except Exception:
+                    logger.exception(f"Request failed: {request_line!r}")
+                    status = HTTPStatus.INTERNAL_SERVER_ERROR
+                    payload = {"error": "Internal error"}
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Returns:
+            [asyncio.Server]: Server listening for requests on host and
+            port, any free port if 0.
+        """
+        return await asyncio.start_server(self.handle, host, port, backlog=BACKLOG)
+
+
+def _response(status, payload, keep_alive):
+    status = HTTPStatus(status)
+    body = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+class ServiceClient:
+    """
+    Client for the service over one kept-alive connection, e.g. one per
+    game of a load test.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+
+    async def request(self, method, path, payload=None):
+        """
+        Args:
+            method (str): HTTP method.
+            path (str): Path, e.g. "/session".
+            payload (dict): JSON body, None for no body.
+
+        Returns:
+            [tuple]: HTTP status and the JSON payload of the response.
+        """
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self._writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+        )
+        await self._writer.drain()
+        status = int((await self._reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if not line.strip():
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        response = await self._reader.readexactly(int(headers["content-length"]))
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, json.loads(response)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._reader = self._writer = None
+
+
+async def run_service(service, host, port):
+    server = await service.serve(host, port)
+    address = server.sockets[0].getsockname()
+    # Flushed, so a script starting the service can read the port.
+    print(f"Serving on http://{address[0]}:{address[1]}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Serve the Wordle solver over a local HTTP/JSON API."
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument(
+        "--port", type=int, default=DEFAULT_PORT, help="Any free port if 0."
+    )
+    parser.add_argument(
+        "--start-word", help="Defaults to the best ranked opener, or 'tizzy'."
+    )
+    parser.add_argument("--strategy", choices=list(STRATEGIES), default="entropy")
+    parser.add_argument(
+        "--hard-mode",
+        action="store_true",
+        help="Only suggest guesses which use every hint revealed so far.",
+    )
+    parser.add_argument("--max-sessions", type=int, default=DEFAULT_MAX_SESSIONS)
+    parser.add_argument(
+        "--session-ttl",
+        type=float,
+        default=DEFAULT_SESSION_TTL,
+        help="Seconds a game can be left idle before it is dropped.",
+    )
+    parser.add_argument(
+        "--guess-cache-file",
+        metavar="FILE",
+        help="Load the guess cache from FILE and save it there on exit.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    table = PatternTable.load(show_progress=True)
+    guess_cache = GuessCache.load(table, args.guess_cache_file)
+    solver = Solver(
+        table,
+        get_strategy(args.strategy),
+        args.start_word or best_opener(table, "tizzy"),
+        hard_mode=args.hard_mode,
+        guess_cache=guess_cache,
+    )
+    service = SolverService(solver, args.max_sessions, args.session_ttl)
+    try:
+        asyncio.run(run_service(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.guess_cache_file:
+            guess_cache.save(args.guess_cache_file)
+            rprint(f"Guess cache saved to {args.guess_cache_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import time
+from collections import Counter
+
+from rich import print as rprint
+
+from wordle_constraints import Constraints
+from wordle_patterns import score_guess
+
+MAX_ROWS = 6
+
+
+class WordleOracle:
+    """
+    Local stand-in for the Wordle web page. It holds the answer and scores
+    each guess exactly as Wordle does, including the duplicate letter rules,
+    so the solver can be played without a browser. In hard mode it rejects
+    guesses which do not use every green and yellow revealed so far.
+    """
+
+    def __init__(
+        self, answer, allowed_guesses=None, max_rows=MAX_ROWS, hard_mode=False
+    ):
+        self.answer = answer
+        self.allowed_guesses = allowed_guesses
+        self.max_rows = max_rows
+        self.hard_mode = hard_mode
+        self.hints = Constraints()
+        self.history = []
+        self.solved = False
+
+    @property
+    def game_over(self):
+        return self.solved or len(self.history) >= self.max_rows
+
+    def guess(self, word):
+        """
+        Enters a word into the next row of the puzzle.
+
+        Args:
+            word (str): Word to be entered into the puzzle.
+
+        Returns:
+            [list]: List containing 5 elements with the result of each
+            character in the row, "correct", "present" or "absent"
+        """
+        if self.game_over:
+            raise ValueError("The game is already over")
+        if self.allowed_guesses is not None and word not in self.allowed_guesses:
+            raise ValueError(f"'{word}' is not in the allowed guesses")
+        if self.hard_mode and not self.hints.allows(word):
+            raise ValueError(f"'{word}' does not use every hint (hard mode)")
+        row_results = score_guess(word, self.answer)
+        self.hints.merge(Constraints.from_row(word, row_results).hints())
+        self.history.append((word, row_results))
+        self.solved = word == self.answer
+        return row_results
+
+
+def play_game(solver, answer, start_word=None, max_rows=MAX_ROWS):
+    """
+    Plays one game of the solver against the oracle.
+
+    Args:
+        solver (Solver): Solver to play with, a new session is used.
+        answer (str): Solution of the puzzle.
+        start_word (str): First word entered, the solver's start word if None.
+        max_rows (int): Number of guesses allowed.
+
+    Returns:
+        [dict]: The answer, the guesses made and whether it was solved.
+    """
+    oracle = WordleOracle(answer, solver.table.guess_index, max_rows, solver.hard_mode)
+    session = solver.new_session(start_word)
+    word = session.next_word
+    while True:
+        row_results = oracle.guess(word)
+        if oracle.game_over:
+            break
+        word = session.update(word, row_results)
+    return {
+        "answer": answer,
+        "guesses": [word for word, _ in oracle.history],
+        "solved": oracle.solved,
+    }
+
+
+def play_boards(solver, answers, start_word=None, max_rows=None):
+    """
+    Plays one game of several boards at once, one oracle per board, every
+    guess entered into each board not solved yet.
+
+    Args:
+        solver (Solver): Solver to play with.
+        answers (list): Solution of each board.
+        start_word (str): First word entered, the solver's start word if None.
+        max_rows (int): Number of guesses allowed, one more than MAX_ROWS
+        per extra board if None (7 for Dordle, 9 for Quordle).
+
+    Returns:
+        [dict]: The answers, the guesses made, the number of boards solved
+        and whether every board was solved.
+    """
+    max_rows = max_rows or MAX_ROWS + len(answers) - 1
+    oracles = [
+        WordleOracle(answer, solver.table.guess_index, max_rows) for answer in answers
+    ]
+    session = solver.new_boards(len(answers), start_word)
+    word = session.next_word
+    for _ in range(max_rows):
+        board_results = [
+            None if oracle.solved else oracle.guess(word) for oracle in oracles
+        ]
+        word = session.update(word, board_results)
+        if word is None:
+            break
+    return {
+        "answers": list(answers),
+        "guesses": [word for word, _ in session.history],
+        "boards_solved": sum(oracle.solved for oracle in oracles),
+        "solved": all(oracle.solved for oracle in oracles),
+    }
+
+
+def summarize_guess_cache(results):
+    """
+    Adds up the guess cache totals of the workers which played the games.
+
+    Returns:
+        [dict]: Hits, misses, hit rate, entries and memory of the caches.
+    """
+    latest = {}
+    for result in results:
+        stats = result.get("guess_cache")
+        if stats is None:
+            continue
+        lookups = stats["hits"] + stats["misses"]
+        seen = latest.get(stats["worker"])
+        if seen is None or lookups > seen["hits"] + seen["misses"]:
+            latest[stats["worker"]] = stats
+    totals = {
+        name: sum(stats[name] for stats in latest.values())
+        for name in ["hits", "misses", "entries", "memory_bytes"]
+    }
+    lookups = totals["hits"] + totals["misses"]
+    totals["hit_rate"] = totals["hits"] / lookups if lookups else 0.0
+    return totals
+
+
+def summarize(results, elapsed):
+    """
+    Builds the guess count distribution and headline numbers for a run.
+
+    Args:
+        results (list): Result of each game as returned by play_game.
+        elapsed (float): Wall clock time of the run in seconds.
+
+    Returns:
+        [dict]: Summary of the run.
+    """
+    solved = [len(result["guesses"]) for result in results if result["solved"]]
+    counts = Counter(solved)
+    distribution = {str(row): counts.get(row, 0) for row in range(1, MAX_ROWS + 1)}
+    distribution["X"] = len(results) - len(solved)
+    return {
+        "games": len(results),
+        "solved": len(solved),
+        "failure_rate": distribution["X"] / max(len(results), 1),
+        "mean_guesses": sum(solved) / max(len(solved), 1),
+        "distribution": distribution,
+        "failures": sorted(
+            result["answer"] for result in results if not result["solved"]
+        ),
+        "elapsed": elapsed,
+        "games_per_sec": len(results) / max(elapsed, 1e-9),
+    }
+
+
+def print_guess_cache(stats):
+    rprint(
+        f"Guess Cache : {stats['hit_rate'] * 100:.1f} % hits "
+        f"({stats['hits']} hits, {stats['misses']} misses), "
+        f"{stats['entries']} entries, {stats['memory_bytes'] / 1024:.0f} KiB"
+    )
+
+
+def simulate(solver, answers=None):
+    """
+    Plays the solver against each answer (every answer in the word list if
+    none are given) and prints the outcome.
+
+    Returns:
+        [list]: Result of each game as returned by play_game.
+    """
+    table = solver.table
+    answers = answers or table.answers
+    results = []
+    sim_start = time.time()
+    for answer in answers:
+        if answer not in table.answer_index:
+            rprint(f"Uh Oh - '{answer}' is not in the word list \U0001f622")
+            continue
+        result = play_game(solver, answer)
+        results.append(result)
+        if len(answers) <= 10:
+            status = "Solved" if result["solved"] else "Failed"
+            rprint(f"{answer}: {status} - {' > '.join(result['guesses'])}")
+    elapsed = time.time() - sim_start
+    if results:
+        solved = [len(result["guesses"]) for result in results if result["solved"]]
+        rprint(f"Games Played : {len(results)}, Solved : {len(solved)}")
+        if solved:
+            rprint(f"Average Guesses : {sum(solved) / len(solved):.3f}")
+        rprint(f"Games / Sec : {len(results) / max(elapsed, 1e-9):.1f}")
+    return results
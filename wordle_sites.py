@@ -0,0 +1,470 @@
+import functools
+import http.server
+import logging
+import os
+import threading
+
+from rich.progress import track
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+
+from wordle_browser import settled, type_word, wait_for
+from wordle_trace import tracer
+
+logger = logging.getLogger(__name__)
+
+RESULTS = ("correct", "present", "absent")
+LOCAL_SITE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "wordle_local"
+)
+
+
+class GameSiteAdapter:
+    """
+    Everything the solver needs to know about one Wordle web page: how to
+    open a puzzle, enter a word, read a row of the board and tell a win.
+    Subclasses give the page's URL, on-screen keyboard selectors and a
+    board_script which returns every tile (or the row at arguments[0]) as
+    a dict with its "letter" and "state", "" until it is revealed.
+    """
+
+    keyboard = {}
+    board_script = None
+
+    def __init__(self, physical_keyboard=True, show_progress=True):
+        """
+        Args:
+            physical_keyboard (bool): Type each word with key presses in one
+            call, clicking the on-screen keyboard only if the page does not
+            take them.
+            show_progress (bool): Show Rich progress bars.
+        """
+        self.physical_keyboard = physical_keyboard
+        self.show_progress = show_progress
+
+    def url(self, puzzle=None):
+        raise NotImplementedError
+
+    def open(self, web_driver, puzzle=None):
+        """
+        Loads the puzzle and gets the page ready for the first word.
+
+        Args:
+            web_driver (selenium.webdriver): Selenium Webdriver
+            puzzle: Which puzzle to open, the site's daily puzzle if None.
+        """
+        web_driver.get(self.url(puzzle))
+        self.dismiss_dialogs(web_driver)
+
+    def dismiss_dialogs(self, web_driver):
+        """
+        Closes whatever the page shows over the board when it loads.
+        """
+
+    def keyboard_root(self, web_driver):
+        """
+        Returns:
+            The element or shadow root the keyboard selectors are relative to.
+        """
+        return web_driver
+
+    def tile_state(self, tile):
+        """
+        Returns:
+            [str]: "correct", "present" or "absent" for a tile read by
+            board_script, "" if it is not revealed yet.
+        """
+        return tile["state"] if tile["state"] in RESULTS else ""
+
+    def read_board(self, web_driver, row_number=None):
+        """
+        Reads the letter and result of every tile with a single
+        execute_script call instead of a find_element call per tile.
+
+        Args:
+            web_driver (selenium.webdriver): Selenium Webdriver
+            row_number (int): Row to read, every row if None.
+
+        Returns:
+            [list]: A list per row of the tiles, each a dict with the
+            "letter" and "state" ("correct", "present", "absent" or "").
+        """
+        with tracer.span("board_read", row=row_number):
+            row_index = None if row_number is None else row_number - 1
+            rows = web_driver.execute_script(self.board_script, row_index)
+            return [
+                [
+                    {"letter": tile["letter"], "state": self.tile_state(tile)}
+                    for tile in row
+                ]
+                for row in rows
+            ]
+
+    def read_row(self, web_driver, row_number):
+        """
+        Returns:
+            [list]: Tiles of the row as returned by read_board.
+        """
+        return self.read_board(web_driver, row_number)[0]
+
+    def row_letters(self, web_driver, row_number):
+        """
+        Returns:
+            [str]: Letters shown in the row.
+        """
+        return "".join(tile["letter"] for tile in self.read_row(web_driver, row_number))
+
+    def click_key(self, web_driver, key):
+        self.keyboard_root(web_driver).find_element(
+            By.CSS_SELECTOR, self.keyboard[key]
+        ).click()
+
+    def enter_word(self, web_driver, word, row_number):
+        """
+        Enters the word into the row and submits it. The word and Enter are
+        typed as key presses in one call if physical_keyboard is set. If the
+        page does not take them, or the option is off, the on-screen
+        keyboard is clicked one character at a time, waiting for each tile
+        to show its character before moving on to the next.
+
+        Args:
+            web_driver (selenium.webdriver): Selenium Webdriver
+            word (str): Word to be entered into the row.
+            row_number (int): Row number the word is entered into.
+        """
+        with tracer.span("key_entry", row=row_number):
+            if self.physical_keyboard:
+                type_word(web_driver, word)
+                try:
+                    wait_for(
+                        web_driver,
+                        lambda driver: self.row_letters(driver, row_number) == word,
+                        f"row {row_number} to show '{word}'",
+                        timeout=2,
+                    )
+                    return
+                except TimeoutException:
+                    logger.warning(
+                        "Key presses not taken, clicking the on-screen keyboard"
+                    )
+                    for _ in word:
+                        self.click_key(web_driver, "del")
+            for idx, char in enumerate(
+                track(
+                    word,
+                    description="Entering the Word",
+                    disable=not self.show_progress,
+                )
+            ):
+                self.click_key(web_driver, char)
+                wait_for(
+                    web_driver,
+                    lambda driver: self.read_row(driver, row_number)[idx]["letter"]
+                    == char,
+                    f"row {row_number} tile {idx + 1} to show '{char}'",
+                )
+            self.click_key(web_driver, "enter")
+
+    def reveal_row(self, web_driver, row_number):
+        """
+        Waits for the flip animation of the row to finish, i.e. for every
+        tile to show a result which stays the same between two polls, and
+        returns the results.
+
+        Args:
+            web_driver (selenium.webdriver): Selenium Webdriver
+            row_number (int): Row number for which the results are needed.
+
+        Returns:
+            [list]: "correct", "present" or "absent" for each character in
+            the row, "other" for tiles which were not revealed.
+        """
+        with tracer.span("reveal", row=row_number):
+            try:
+                row = wait_for(
+                    web_driver,
+                    settled(
+                        lambda driver: self.read_row(driver, row_number),
+                        lambda row: all(tile["state"] for tile in row),
+                    ),
+                    f"row {row_number} to be revealed",
+                )
+            except TimeoutException:
+                # e.g. the word was not accepted, the caller reports the
+                # "other" tiles.
+                row = self.read_row(web_driver, row_number)
+            return [
+                tile["state"] or "other"
+                for tile in track(
+                    row, description="Analyzing Results", disable=not self.show_progress
+                )
+            ]
+
+
+class NYTAdapter(GameSiteAdapter):
+    """
+    The original powerlanguage.co.uk Wordle, now on nytimes.com, built from
+    custom elements in nested shadow roots.
+    """
+
+    keyboard = {
+        "q": "div:nth-child(1) > button:nth-child(1)",
+        "w": "div:nth-child(1) > button:nth-child(2)",
+        "e": "div:nth-child(1) > button:nth-child(3)",
+        "r": "div:nth-child(1) > button:nth-child(4)",
+        "t": "div:nth-child(1) > button:nth-child(5)",
+        "y": "div:nth-child(1) > button:nth-child(6)",
+        "u": "div:nth-child(1) > button:nth-child(7)",
+        "i": "div:nth-child(1) > button:nth-child(8)",
+        "o": "div:nth-child(1) > button:nth-child(9)",
+        "p": "div:nth-child(1) > button:nth-child(10)",
+        "a": "div:nth-child(2) > button:nth-child(2)",
+        "s": "div:nth-child(2) > button:nth-child(3)",
+        "d": "div:nth-child(2) > button:nth-child(4)",
+        "f": "div:nth-child(2) > button:nth-child(5)",
+        "g": "div:nth-child(2) > button:nth-child(6)",
+        "h": "div:nth-child(2) > button:nth-child(7)",
+        "j": "div:nth-child(2) > button:nth-child(8)",
+        "k": "div:nth-child(2) > button:nth-child(9)",
+        "l": "div:nth-child(2) > button:nth-child(10)",
+        "enter": "div:nth-child(3) > button:nth-child(1)",
+        "z": "div:nth-child(3) > button:nth-child(2)",
+        "x": "div:nth-child(3) > button:nth-child(3)",
+        "c": "div:nth-child(3) > button:nth-child(4)",
+        "v": "div:nth-child(3) > button:nth-child(5)",
+        "b": "div:nth-child(3) > button:nth-child(6)",
+        "n": "div:nth-child(3) > button:nth-child(7)",
+        "m": "div:nth-child(3) > button:nth-child(8)",
+        "del": "div:nth-child(3) > button:nth-child(9)",
+    }
+    board_script = """
+const app = document.querySelector("game-app").shadowRoot;
+let rows = Array.from(app.querySelectorAll("#board > game-row"));
+if (arguments[0] !== null) rows = [rows[arguments[0]]];
+return rows.map((row) =>
+    Array.from(row.shadowRoot.querySelectorAll("game-tile")).map((tile) => {
+        const cell = tile.shadowRoot.querySelector("div");
+        const idle = !cell || !cell.dataset.animation || cell.dataset.animation === "idle";
+        return {
+            letter: tile.getAttribute("letter") || "",
+            state: (idle && tile.getAttribute("evaluation")) || "",
+        };
+    })
+);
+"""
+
+    def url(self, puzzle=None):
+        return "https://www.powerlanguage.co.uk/wordle/"
+
+    def app_root(self, web_driver):
+        return web_driver.find_element(By.CSS_SELECTOR, "game-app").shadow_root
+
+    def dismiss_dialogs(self, web_driver):
+        # Close the initial help screen
+        game_modal_root = self.app_root(web_driver).find_element(
+            By.CSS_SELECTOR, "game-modal"
+        )
+        game_modal_root.shadow_root.find_element(By.CSS_SELECTOR, "game-icon").click()
+
+    def keyboard_root(self, web_driver):
+        return (
+            self.app_root(web_driver)
+            .find_element(By.CSS_SELECTOR, "game-keyboard")
+            .shadow_root
+        )
+
+
+class ArchiveAdapter(GameSiteAdapter):
+    """
+    The Wordle Archive at devangthakkar.com, a React page with plain span
+    tiles. Puzzles are opened by archive number.
+    """
+
+    keyboard = {
+        "q": "div:nth-child(1) > button:nth-child(1) > div",
+        "w": "div:nth-child(1) > button:nth-child(2)",
+        "e": "div:nth-child(1) > button:nth-child(3)",
+        "r": "div:nth-child(1) > button:nth-child(4)",
+        "t": "div:nth-child(1) > button:nth-child(5)",
+        "y": "div:nth-child(1) > button:nth-child(6)",
+        "u": "div:nth-child(1) > button:nth-child(7)",
+        "i": "div:nth-child(1) > button:nth-child(8)",
+        "o": "div:nth-child(1) > button:nth-child(9)",
+        "p": "div:nth-child(1) > button:nth-child(10)",
+        "a": "div:nth-child(2) > button:nth-child(1) > div",
+        "s": "div:nth-child(2) > button:nth-child(2)",
+        "d": "div:nth-child(2) > button:nth-child(3)",
+        "f": "div:nth-child(2) > button:nth-child(4)",
+        "g": "div:nth-child(2) > button:nth-child(5)",
+        "h": "div:nth-child(2) > button:nth-child(6)",
+        "j": "div:nth-child(2) > button:nth-child(7)",
+        "k": "div:nth-child(2) > button:nth-child(8)",
+        "l": "div:nth-child(2) > button:nth-child(9)",
+        "enter": "div:nth-child(3) > button:nth-child(1)",
+        "z": "div:nth-child(3) > button:nth-child(2)",
+        "x": "div:nth-child(3) > button:nth-child(3)",
+        "c": "div:nth-child(3) > button:nth-child(4)",
+        "v": "div:nth-child(3) > button:nth-child(5)",
+        "b": "div:nth-child(3) > button:nth-child(6)",
+        "n": "div:nth-child(3) > button:nth-child(7)",
+        "m": "div:nth-child(3) > button:nth-child(8)",
+        "del": "div:nth-child(3) > button:nth-child(9)",
+    }
+    # The tile's data-state attribute is used when the page sets one, else
+    # its background color is mapped by tile_state.
+    board_script = """
+const tiles = [];
+for (let i = 1; i <= 30; i++) {
+    const tile = document.querySelector(`span:nth-child(${i})`);
+    tiles.push({
+        letter: tile ? tile.textContent.trim().toLowerCase() : "",
+        state: (tile && tile.dataset.state) || "",
+        colour: tile ? getComputedStyle(tile).backgroundColor : "",
+    });
+}
+const rows = [];
+for (let i = 0; i < 6; i++) rows.push(tiles.slice(i * 5, i * 5 + 5));
+return arguments[0] === null ? rows : [rows[arguments[0]]];
+"""
+
+    def __init__(self, dark_mode=False, **kwargs):
+        super().__init__(**kwargs)
+        self.dark_mode = dark_mode
+
+    def url(self, puzzle=None):
+        return f"https://www.devangthakkar.com/wordle_archive/?{puzzle}"
+
+    def dismiss_dialogs(self, web_driver):
+        #
+        # Close the initial Welcome Screen
+        #
+        close_button = web_driver.find_element(
+            By.CSS_SELECTOR, "body > div:nth-child(5) > div > div > div > button"
+        )
+        close_button.click()
+
+        # Turn On Dark Mode
+        if self.dark_mode:
+            settings_button = web_driver.find_element(
+                By.CSS_SELECTOR, "button:nth-child(1)"
+            )
+            settings_button.click()
+            darkmode_button = web_driver.find_element(
+                By.CSS_SELECTOR, "#headlessui-switch-3"
+            )
+            darkmode_button.click()
+            close_settings = web_driver.find_element(
+                By.CSS_SELECTOR,
+                "body > div:nth-child(6) > div > div > div > div > div > button",
+            )
+            close_settings.click()
+
+    def close_result(self, web_driver):
+        """
+        Closes the dialog shown when the puzzle is solved.
+        """
+        web_driver.find_element(
+            By.CSS_SELECTOR,
+            "body > div:nth-child(5) > div > div > div > div > div > button",
+        ).click()
+
+    def tile_state(self, tile):
+        if tile["state"] in RESULTS:
+            return tile["state"]
+        result = colour_result(normalise_colour(tile["colour"]))
+        return result if result in RESULTS else ""
+
+
+class LocalAdapter(GameSiteAdapter):
+    """
+    The static Wordle clone in wordle_local/, served by serve_local_site.
+    It has a flip animation and an on-screen keyboard like the real pages,
+    so the browser path can be tested and timed offline. The puzzle is the
+    answer itself.
+    """
+
+    keyboard = {
+        **{
+            char: f'#keyboard button[data-key="{char}"]'
+            for char in "abcdefghijklmnopqrstuvwxyz"
+        },
+        "enter": '#keyboard button[data-key="enter"]',
+        "del": '#keyboard button[data-key="del"]',
+    }
+    board_script = """
+let rows = Array.from(document.querySelectorAll("#board .row"));
+if (arguments[0] !== null) rows = [rows[arguments[0]]];
+return rows.map((row) =>
+    Array.from(row.querySelectorAll(".tile")).map((tile) => ({
+        letter: tile.textContent.trim().toLowerCase(),
+        state: tile.dataset.state || "",
+    }))
+);
+"""
+
+    def __init__(self, base_url, reveal_ms=300, **kwargs):
+        """
+        Args:
+            base_url (str): Address the site is served from.
+            reveal_ms (int): Flip animation time of each tile.
+        """
+        super().__init__(**kwargs)
+        self.base_url = base_url
+        self.reveal_ms = reveal_ms
+
+    def url(self, puzzle=None):
+        return f"{self.base_url}/index.html?answer={puzzle}&reveal_ms={self.reveal_ms}"
+
+
+def normalise_colour(colour):
+    """
+    Returns:
+        [str]: Color from getComputedStyle in the "rgba(r, g, b, a)" form
+        returned by value_of_css_property, e.g. "rgb(1, 2, 3)" becomes
+        "rgba(1, 2, 3, 1)".
+    """
+    if colour.startswith("rgb("):
+        return f"rgba({colour[4:-1]}, 1)"
+    return colour
+
+
+def colour_result(bg):
+    """
+    Returns:
+        [str]: "correct", "present", "absent" or "other" for an archive
+        tile color.
+    """
+    match bg:
+        case "rgba(234, 179, 8, 1)" | "rgba(201, 180, 88, 1)":
+            return "present"
+        case "rgba(96, 102, 133, 1)" | "rgba(120, 124, 126, 1)":
+            return "absent"
+        case "rgba(99, 170, 85, 1)" | "rgba(106, 170, 100, 1)":
+            return "correct"
+        case "rgba(54, 57, 74, 1)" | "rgba(231, 232, 238, 1)":
+            return "other"
+        case _:
+            return "other"
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def serve_local_site(port=0):
+    """
+    Serves wordle_local/ over HTTP on localhost from a daemon thread.
+
+    Args:
+        port (int): Port to listen on, any free port if 0.
+
+    Returns:
+        [tuple]: The server, stopped with its shutdown method, and its URL.
+    """
+    server = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", port),
+        functools.partial(_QuietHandler, directory=LOCAL_SITE_DIR),
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
@@ -0,0 +1,333 @@
+from wordle_constraints import Constraints, LetterIndex
+from wordle_patterns import PatternTable, pattern_to_results, results_to_pattern
+from wordle_policy import DecisionTree, SecondGuessTable
+from wordle_strategy import get_strategy
+from wordle_trace import tracer
+
+
+class Solver:
+    """
+    The shared, read-only part of the solver: word lists, pattern matrix,
+    strategy, the precomputed tables for the start word and, in hard mode,
+    letter bitsets of the guesses. It is loaded once and hands out a cheap
+    SolverSession per game, so one process can play any number of games,
+    concurrently or not.
+    """
+
+    def __init__(
+        self,
+        table=None,
+        strategy=None,
+        start_word="tizzy",
+        use_second_guesses=True,
+        use_tree=True,
+        hard_mode=False,
+        guess_cache=None,
+    ):
+        """
+        Args:
+            table (PatternTable): Word lists and pattern matrix, loaded from
+            the cache if None.
+            strategy (Strategy): Strategy picking each guess, entropy if None.
+            start_word (str): First word entered into each game.
+            use_second_guesses (bool): Look up turn two in the second guess
+            table for start_word, building it if needed.
+            use_tree (bool): Walk the compiled decision tree for start_word
+            if one has been built.
+            hard_mode (bool): Play Wordle's hard mode, where every guess
+            must use the greens and yellows revealed so far. Only the
+            guesses which do are scored. The second guess table and the
+            decision tree are built for normal mode and are not used.
+            guess_cache (GuessCache): Remembers the word picked for each set
+            of remaining candidates, so it is only scored once.
+        """
+        self.table = table or PatternTable.load()
+        self.strategy = strategy or get_strategy("entropy")
+        if start_word not in self.table.guess_index:
+            raise ValueError(f"'{start_word}' is not in the allowed guesses")
+        self.start_word = start_word
+        self.hard_mode = hard_mode
+        self.guess_letter_index = None
+        if hard_mode:
+            self.guess_letter_index = LetterIndex(self.table.guesses)
+            use_second_guesses = use_tree = False
+        self.second_guesses = None
+        if use_second_guesses:
+            self.second_guesses = SecondGuessTable.load(
+                self.table, self.strategy, start_word
+            )
+        self.tree = None
+        if use_tree:
+            self.tree = DecisionTree.load(self.table, self.strategy, start_word)
+        self.guess_cache = guess_cache
+
+    def new_session(self, start_word=None):
+        """
+        Args:
+            start_word (str): Opener for this game only. The precomputed
+            tables are not used if it differs from the solver's start word.
+
+        Returns:
+            [SolverSession]: State for a new game.
+        """
+        return SolverSession(self, start_word or self.start_word)
+
+    def new_boards(self, num_boards, start_word=None):
+        """
+        Args:
+            num_boards (int): Boards played at once, e.g. 2 for Dordle or 4
+            for Quordle.
+            start_word (str): Opener for this game only.
+
+        Returns:
+            [MultiBoardSession]: State for a new game of several boards.
+        """
+        return MultiBoardSession(self, num_boards, start_word or self.start_word)
+
+    def choose(self, candidates, guesses=None):
+        """
+        Asks the strategy for the next word, or the guess cache if it has
+        seen the same candidates before.
+
+        Args:
+            candidates (numpy.ndarray): Indexes of the remaining answers.
+            guesses (numpy.ndarray): Indexes of the guesses allowed in hard
+            mode, None in normal mode.
+
+        Returns:
+            [str]: Word to enter next.
+        """
+        if self.guess_cache is None:
+            return self.strategy.choose(self.table, candidates, guesses)
+        key = self.guess_cache.key(self.table, self.strategy, candidates, guesses)
+        word = self.guess_cache.get(key)
+        if word is None:
+            word = self.strategy.choose(self.table, candidates, guesses)
+            self.guess_cache.put(key, word)
+        return word
+
+
+class SolverSession:
+    """
+    The state of one game: the answers still possible and the guesses made.
+    In hard mode also the constraints of every row so far and the guesses
+    which still use every hint.
+    """
+
+    def __init__(self, solver, start_word):
+        self.solver = solver
+        self.start_word = start_word
+        # Indexes of the answers still possible.
+        self.candidates = solver.table.all_candidates()
+        # Indexes of the guesses allowed in hard mode and the constraints of
+        # every row so far, which prune them. None in normal mode.
+        self.guesses = None
+        self.constraints = None
+        if solver.hard_mode:
+            self.guesses = solver.table.all_guesses()
+            self.constraints = Constraints()
+        self.history = []
+        self.next_word = start_word
+        self._on_policy = start_word == solver.start_word
+        self._walker = None
+        if self._on_policy and solver.tree is not None:
+            self._walker = solver.tree.walk()
+
+    @property
+    def solved(self):
+        return bool(self.history) and set(self.history[-1][1]) == {"correct"}
+
+    def remaining_words(self):
+        """
+        Returns:
+            [list]: Answers still possible.
+        """
+        return self.solver.table.words(self.candidates)
+
+    def plan(self, word_guess):
+        """
+        Works out the strategy's next word for every feedback word_guess can
+        get from the answers still possible, without changing the session,
+        so it can run while the row is still being revealed. Nothing is
+        worked out when the decision tree or second guess table will give
+        the next word anyway.
+
+        Args:
+            word_guess (str): Word entered into the puzzle.
+
+        Returns:
+            [dict]: Next word for each feedback pattern, to pass to update.
+        """
+        solver = self.solver
+        if word_guess == self.next_word:
+            if self._walker is not None and self._walker.node is not None:
+                return {}
+            if (
+                self._on_policy
+                and solver.second_guesses is not None
+                and not self.history
+            ):
+                return {}
+        table = solver.table
+        candidates = self.candidates
+        row = table.patterns(word_guess, candidates)
+        with tracer.span("plan", row=len(self.history) + 1):
+            return {
+                pattern: solver.choose(
+                    candidates[row == pattern],
+                    self._guesses_after(
+                        word_guess, pattern_to_results(pattern, table.word_length)
+                    ),
+                )
+                for pattern in set(row.tolist()) - {table.all_correct}
+            }
+
+    def _guesses_after(self, word_guess, row_results, constraints=None):
+        """
+        Returns:
+            [numpy.ndarray]: Guesses allowed in hard mode after the row,
+            None in normal mode.
+        """
+        if self.guesses is None:
+            return None
+        constraints = constraints or Constraints.from_row(word_guess, row_results)
+        return self.solver.guess_letter_index.filter(self.guesses, constraints.hints())
+
+    def update(self, word_guess, row_results, plan=None):
+        """
+        Records the results of a row, eliminates the answers it rules out
+        and picks the next word. The session is left unchanged if it
+        raises ValueError, e.g. for results no remaining answer gives.
+
+        Args:
+            word_guess (str): Word entered into the puzzle.
+            row_results (list): Result for each character of the row.
+            plan (dict): Next words worked out by plan for this row.
+
+        Returns:
+            [str]: Next word to enter, None if the puzzle is solved.
+        """
+        solver = self.solver
+        if set(row_results) == {"correct"}:
+            self.history.append((word_guess, list(row_results)))
+            self.next_word = None
+            return None
+        with tracer.span("filter", row=len(self.history) + 1):
+            # The earlier rows have already ruled out the other answers, so
+            # only the answers still possible are checked against the row.
+            candidates = solver.table.filter(self.candidates, word_guess, row_results)
+            if not len(candidates):
+                raise ValueError("No words in the word list match the results")
+            # Nothing is recorded until the row is known to be valid, so a
+            # mistyped row leaves the session as it was.
+            if word_guess != self.next_word:
+                # The tree and second guess table only follow the words
+                # they suggest.
+                self._on_policy = False
+                self._walker = None
+            self.history.append((word_guess, list(row_results)))
+            self.candidates = candidates
+            if self.guesses is not None:
+                # Only the constraints new in this row prune the guesses.
+                new_constraints = self.constraints.merge(
+                    Constraints.from_row(word_guess, row_results)
+                )
+                self.guesses = self._guesses_after(
+                    word_guess, row_results, new_constraints
+                )
+        next_word = None
+        if self._walker is not None:
+            next_word = self._walker.next_guess(row_results)
+        if (
+            next_word is None
+            and self._on_policy
+            and solver.second_guesses is not None
+            and len(self.history) == 1
+        ):
+            next_word = solver.second_guesses.lookup(row_results)
+        if next_word is None and plan:
+            next_word = plan.get(results_to_pattern(row_results))
+        if next_word is None:
+            with tracer.span("score", row=len(self.history)):
+                next_word = solver.choose(self.candidates, self.guesses)
+        self.next_word = next_word
+        return next_word
+
+
+class MultiBoardSession:
+    """
+    The state of a game of several boards which share every guess, like
+    Dordle or Quordle: the answers still possible on each board. A board
+    drops out once it is solved. The second guess table, decision tree and
+    hard mode are for a single board and are not used.
+    """
+
+    def __init__(self, solver, num_boards, start_word):
+        table = solver.table
+        self.solver = solver
+        self.start_word = start_word
+        self.boards = [table.all_candidates() for _ in range(num_boards)]
+        self.solved_boards = [False] * num_boards
+        self.history = []
+        self.next_word = start_word
+
+    @property
+    def solved(self):
+        return all(self.solved_boards)
+
+    def remaining_boards(self):
+        """
+        Returns:
+            [list]: Indexes of the answers still possible on each board not
+            solved yet.
+        """
+        return [
+            candidates
+            for candidates, solved in zip(self.boards, self.solved_boards)
+            if not solved
+        ]
+
+    def update(self, word_guess, board_results):
+        """
+        Records the results of a row on every board, eliminates the answers
+        they rule out and picks the next word for the boards left. The
+        session is left unchanged if it raises ValueError.
+
+        Args:
+            word_guess (str): Word entered into every board.
+            board_results (list): Result for each character of the row on
+            each board, None for the boards solved before.
+
+        Returns:
+            [str]: Next word to enter, None if every board is solved.
+        """
+        solver = self.solver
+        boards = list(self.boards)
+        solved_boards = list(self.solved_boards)
+        with tracer.span("filter", row=len(self.history) + 1):
+            for number, row_results in enumerate(board_results):
+                if solved_boards[number]:
+                    continue
+                if set(row_results) == {"correct"}:
+                    solved_boards[number] = True
+                    continue
+                boards[number] = solver.table.filter(
+                    boards[number], word_guess, row_results
+                )
+                if not len(boards[number]):
+                    raise ValueError(
+                        f"No words in the word list match the results of "
+                        f"board {number + 1}"
+                    )
+        # Nothing is recorded until every board's row is known to be valid.
+        self.history.append((word_guess, board_results))
+        self.boards = boards
+        self.solved_boards = solved_boards
+        if self.solved:
+            self.next_word = None
+            return None
+        with tracer.span("score", row=len(self.history)):
+            self.next_word = solver.strategy.choose_boards(
+                solver.table, self.remaining_boards()
+            )
+        return self.next_word
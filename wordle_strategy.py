@@ -0,0 +1,353 @@
+import numpy as np
+
+from wordle_patterns import NUM_PATTERNS
+
+# Up to this many weighted candidates, summing runs of sorted patterns is
+# cheaper than a 243 bin histogram per guess.
+GROUPED_MAX_CANDIDATES = 64
+# Guesses x candidates histogrammed per block. Blocks of this size stay in
+# the CPU caches, however many candidates there are.
+BLOCK_ELEMENTS = 1 << 16
+
+
+def pattern_histograms(
+    matrix, candidates, weights=None, block_size=None, num_bins=NUM_PATTERNS, keys=None
+):
+    """
+    Histograms the feedback patterns of each guess over the candidates, a
+    block of guesses at a time, with one bincount per block.
+
+    Args:
+        matrix (numpy.ndarray): Pattern matrix (or a slice of its rows).
+        candidates (numpy.ndarray): Indexes of the remaining answers.
+        weights (numpy.ndarray): Weight of each candidate, counts if None.
+        block_size (int): Number of guesses histogrammed per vectorized
+        block, about BLOCK_ELEMENTS values' worth if None.
+        num_bins (int): Number of bins per guess, 243 for five letter words.
+        keys (numpy.ndarray): Offset added to the patterns of each
+        candidate, e.g. to histogram the candidates of several boards
+        into separate bins.
+
+    Yields:
+        [tuple]: Index of the first guess in the block, the
+        (block rows, num_bins) histogram and the (block rows, candidates)
+        index of each candidate's bin in the flattened histogram.
+    """
+    sub_matrix = matrix[:, candidates]
+    block_size = block_size or max(1, BLOCK_ELEMENTS // max(len(candidates), 1))
+    # Bin of each row and candidate of a block, less its pattern.
+    bases = (np.arange(block_size) * num_bins)[:, None]
+    if keys is not None:
+        bases = bases + keys
+    for start in range(0, len(sub_matrix), block_size):
+        block = sub_matrix[start : start + block_size]
+        rows = len(block)
+        offsets = bases[:rows] + block
+        histogram = np.bincount(
+            offsets.ravel(),
+            weights=None if weights is None else np.tile(weights, rows),
+            minlength=rows * num_bins,
+        ).reshape(rows, num_bins)
+        yield start, histogram, offsets
+
+
+def pattern_entropies(matrix, candidates, weights=None, num_patterns=NUM_PATTERNS):
+    """
+    Computes the expected information (in bits) gained by each guess.
+
+    Args:
+        matrix (numpy.ndarray): Pattern matrix of guesses x answers.
+        candidates (numpy.ndarray): Indexes of the remaining answers.
+        weights (numpy.ndarray): Prior weight of each candidate, uniform if None.
+        num_patterns (int): Number of feedback patterns, 243 for five letter
+        words.
+
+    Returns:
+        [numpy.ndarray]: Entropy of the feedback distribution for each guess.
+    """
+    return board_entropies(
+        matrix, [candidates], None if weights is None else [weights], num_patterns
+    )
+
+
+def board_entropies(matrix, boards, weights=None, num_patterns=NUM_PATTERNS):
+    """
+    Computes the information (in bits) each guess is expected to gain over
+    several boards played at once, e.g. the four of Quordle. The boards'
+    answers are independent, so this is the sum of the entropies on each
+    board. The candidates of every board are scored in one vectorized pass,
+    each board with its own bins, so a move costs about as much as on one
+    board with as many candidates.
+
+    Args:
+        matrix (numpy.ndarray): Pattern matrix of guesses x answers.
+        boards (list): Indexes of the remaining answers of each board.
+        weights (list): Prior weight of each candidate of each board,
+        uniform if None.
+        num_patterns (int): Number of feedback patterns, 243 for five letter
+        words.
+
+    Returns:
+        [numpy.ndarray]: Summed entropy of the feedback for each guess.
+    """
+    sizes = np.array([len(candidates) for candidates in boards])
+    candidates = np.concatenate(boards)
+    if weights is None:
+        probabilities = np.repeat(1 / sizes, sizes)
+    else:
+        probabilities = np.concatenate([board / board.sum() for board in weights])
+    keys = None
+    if len(boards) > 1:
+        keys = np.repeat(np.arange(len(boards)) * num_patterns, sizes)
+    num_bins = len(boards) * num_patterns
+    if weights is not None and len(candidates) <= GROUPED_MAX_CANDIDATES:
+        return _grouped_entropies(matrix[:, candidates], probabilities, num_bins, keys)
+    entropies = np.empty(len(matrix))
+    if weights is None:
+        # With uniform weights a board's entropy is log2(n) less the mean of
+        # log2(c) over its candidates, c being the count of the candidate's
+        # pattern, or less the sum of c * log2(c) / n over its patterns.
+        # The logs are looked up by count, and whichever of the candidates
+        # or the bins are fewer are summed.
+        log2_counts = np.log2(np.maximum(np.arange(sizes.max() + 1), 1))
+        by_candidate = len(candidates) < num_bins
+        if by_candidate:
+            inverse_sizes = np.repeat(1 / sizes, sizes)
+        else:
+            log2_counts *= np.arange(sizes.max() + 1)
+        total = np.log2(sizes).sum()
+        for start, histogram, offsets in pattern_histograms(
+            matrix, candidates, num_bins=num_bins, keys=keys
+        ):
+            rows = len(histogram)
+            if by_candidate:
+                terms = log2_counts[histogram.ravel()[offsets]] @ inverse_sizes
+            else:
+                terms = log2_counts[histogram].reshape(rows, len(boards), -1)
+                terms = (terms.sum(axis=2) / sizes).sum(axis=1)
+            entropies[start : start + rows] = total - terms
+        return entropies
+    for start, histogram, _ in pattern_histograms(
+        matrix, candidates, probabilities, num_bins=num_bins, keys=keys
+    ):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            terms = np.where(histogram > 0, histogram * np.log2(histogram), 0.0)
+        entropies[start : start + len(histogram)] = -terms.sum(axis=1)
+    return entropies
+
+
+def _grouped_entropies(sub_matrix, probabilities, num_bins, keys):
+    """
+    board_entropies for a few weighted candidates. Sorting each row
+    and summing the runs of equal patterns touches guesses x candidates
+    values instead of a guesses x num_bins histogram.
+    """
+    rows, columns = sub_matrix.shape
+    if keys is not None:
+        # Small integer keys keep to NumPy's radix sort.
+        dtype = np.uint16 if num_bins <= 1 << 16 else np.intp
+        sub_matrix = sub_matrix.astype(dtype) + keys.astype(dtype)
+    order = np.argsort(sub_matrix, axis=1, kind="stable")
+    sorted_keys = np.take_along_axis(sub_matrix, order, axis=1).astype(np.intp)
+    sorted_keys = (sorted_keys + (np.arange(rows) * num_bins)[:, None]).ravel()
+    starts = np.flatnonzero(np.diff(sorted_keys, prepend=-1))
+    group_probabilities = np.add.reduceat(probabilities[order].ravel(), starts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(
+            group_probabilities > 0,
+            group_probabilities * np.log2(group_probabilities),
+            0.0,
+        )
+    return -np.bincount(sorted_keys[starts] // num_bins, weights=terms, minlength=rows)
+
+
+def expected_remaining(matrix, candidates, num_patterns=NUM_PATTERNS):
+    """
+    Computes the expected number of candidates left after each guess,
+    assuming every candidate is equally likely to be the answer.
+
+    Returns:
+        [numpy.ndarray]: Expected remaining candidates for each guess.
+    """
+    remaining = np.empty(len(matrix))
+    for start, histogram, _ in pattern_histograms(
+        matrix, candidates, num_bins=num_patterns
+    ):
+        sizes = (histogram.astype(np.float64) ** 2).sum(axis=1)
+        remaining[start : start + len(histogram)] = sizes / len(candidates)
+    return remaining
+
+
+class Strategy:
+    """
+    Picks the next word to enter into the puzzle from the remaining
+    candidates. Subclasses implement choose().
+    """
+
+    name = "base"
+
+    @property
+    def key(self):
+        """
+        Returns:
+            [str]: Name and settings of the strategy, used to tell apart
+            tables precomputed with different strategies.
+        """
+        return self.name
+
+    def choose(self, table, candidates, guesses=None):
+        """
+        Args:
+            table (PatternTable): Word lists and pattern matrix.
+            candidates (numpy.ndarray): Indexes of the remaining answers.
+            guesses (numpy.ndarray): Indexes of the guesses which may be
+            entered (e.g. in hard mode), every allowed guess if None.
+
+        Returns:
+            [str]: Word to enter next.
+        """
+        raise NotImplementedError
+
+    def choose_boards(self, table, boards):
+        """
+        Picks the word entered into every board still being played, e.g.
+        the four boards of Quordle.
+
+        Args:
+            table (PatternTable): Word lists and pattern matrix.
+            boards (list): Indexes of the remaining answers of each board.
+
+        Returns:
+            [str]: Word to enter next.
+        """
+        raise NotImplementedError
+
+
+class FrequencyStrategy(Strategy):
+    """
+    Picks the remaining candidate with the highest Zipf frequency score, as
+    the more common word is considered more likely to be the solution.
+    """
+
+    name = "frequency"
+
+    def choose(self, table, candidates, guesses=None):
+        # A remaining candidate is always a valid guess, hard mode or not.
+        frequencies = table.answer_frequencies[candidates]
+        return table.answers[candidates[np.argmax(frequencies)]]
+
+    def choose_boards(self, table, boards):
+        # The board closest to being solved.
+        return self.choose(table, min(boards, key=len))
+
+
+class EntropyStrategy(Strategy):
+    """
+    Picks the allowed guess whose feedback is expected to reveal the most
+    information about the remaining candidates. Ties are broken in favour of
+    words which could still be the solution, then by Zipf frequency score.
+
+    With prior="frequency" each candidate is weighted by its frequency score
+    instead of uniformly, so common words are assumed more likely answers.
+    """
+
+    name = "entropy"
+    priors = ("uniform", "frequency")
+
+    def __init__(self, prior="uniform"):
+        if prior not in self.priors:
+            raise ValueError(f"Unknown prior '{prior}', expected one of {self.priors}")
+        self.prior = prior
+        self._fallback = FrequencyStrategy()
+
+    @property
+    def key(self):
+        return f"{self.name}:{self.prior}"
+
+    def _weights(self, table, boards):
+        """
+        Returns:
+            [list]: Frequency score of the candidates of each board, None
+            for uniform weights.
+        """
+        if self.prior != "frequency":
+            return None
+        weights = []
+        for candidates in boards:
+            board_weights = table.answer_frequencies[candidates]
+            if board_weights.sum() <= 0:
+                board_weights = np.ones(len(candidates))
+            weights.append(board_weights)
+        return weights
+
+    def score(self, table, candidates, guesses=None):
+        """
+        Returns:
+            [numpy.ndarray]: Entropy of every allowed guess (or of the
+            guesses given) for the candidates.
+        """
+        matrix = table.matrix if guesses is None else table.matrix[guesses]
+        return board_entropies(
+            matrix, [candidates], self._weights(table, [candidates]), table.num_patterns
+        )
+
+    def choose(self, table, candidates, guesses=None):
+        if len(candidates) <= 2:
+            return self._fallback.choose(table, candidates)
+        entropies = self.score(table, candidates, guesses)
+        best = np.flatnonzero(entropies >= entropies.max() - 1e-9)
+        if guesses is not None:
+            best = guesses[best]
+        return self._break_tie(table, best, table.words(candidates))
+
+    def choose_boards(self, table, boards):
+        for candidates in boards:
+            if len(candidates) == 1:
+                # Solves the board for certain.
+                return table.answers[candidates[0]]
+        entropies = board_entropies(
+            table.matrix,
+            boards,
+            self._weights(table, boards),
+            table.num_patterns,
+        )
+        best = np.flatnonzero(entropies >= entropies.max() - 1e-9)
+        candidate_words = []
+        for candidates in boards:
+            candidate_words.extend(table.words(candidates))
+        return self._break_tie(table, best, candidate_words)
+
+    def _break_tie(self, table, best, candidate_words):
+        """
+        Returns:
+            [str]: The guess in best which could be a solution, then the one
+            with the highest frequency score.
+        """
+        candidate_words = set(candidate_words)
+        is_candidate = np.array([table.guesses[idx] in candidate_words for idx in best])
+        if is_candidate.any():
+            best = best[is_candidate]
+        return table.guesses[best[np.argmax(table.guess_frequencies[best])]]
+
+
+STRATEGIES = {
+    FrequencyStrategy.name: FrequencyStrategy,
+    EntropyStrategy.name: EntropyStrategy,
+}
+
+
+def get_strategy(name, **kwargs):
+    """
+    Creates the strategy registered under name.
+
+    Args:
+        name (str): "frequency" or "entropy".
+
+    Returns:
+        [Strategy]: Strategy instance.
+    """
+    if name not in STRATEGIES:
+        raise ValueError(
+            f"Unknown strategy '{name}', expected one of {list(STRATEGIES)}"
+        )
+    return STRATEGIES[name](**kwargs)
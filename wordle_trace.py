@@ -0,0 +1,151 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from rich import print as rprint
+from rich.table import Table
+
+# Arguments (e.g. game and row) added to every span started under them.
+_context = contextvars.ContextVar("trace_context", default={})
+
+
+class Tracer:
+    """
+    Records how long each stage of a run takes (word loading, filtering,
+    scoring, key entry, board reads, waits) as spans tagged with the game
+    and row they belong to. Off by default, when a span costs next to
+    nothing. The spans export to a Chrome trace file, which opens in
+    chrome://tracing or Perfetto, and summarize to a table per stage.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self._start = time.perf_counter()
+
+    def enable(self):
+        self.enabled = True
+        self.events = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def span(self, name, **args):
+        """
+        Times the block under the stage name.
+
+        Args:
+            name (str): Stage, e.g. "filter" or "key_entry".
+            args: Extra details saved with the span.
+        """
+        if not self.enabled:
+            yield
+            return
+        span_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            span_end = time.perf_counter()
+            self.events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (span_start - self._start) * 1e6,
+                    "dur": (span_end - span_start) * 1e6,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": {**_context.get(), **args},
+                }
+            )
+
+    @contextmanager
+    def context(self, **args):
+        """
+        Tags every span started in the block, in this thread or task, with
+        args, e.g. tracer.context(game="cigar", row=2).
+        """
+        token = _context.set({**_context.get(), **args})
+        try:
+            yield
+        finally:
+            _context.reset(token)
+
+    def summary(self):
+        """
+        Returns:
+            [dict]: Count, total, mean, median, 95th percentile and max
+            milliseconds of each stage.
+        """
+        durations = {}
+        for event in self.events:
+            durations.setdefault(event["name"], []).append(event["dur"] / 1000)
+        summary = {}
+        for name, values in durations.items():
+            values = np.array(values)
+            summary[name] = {
+                "count": len(values),
+                "total_ms": float(values.sum()),
+                "mean_ms": float(values.mean()),
+                "p50_ms": float(np.percentile(values, 50)),
+                "p95_ms": float(np.percentile(values, 95)),
+                "max_ms": float(values.max()),
+            }
+        return summary
+
+    def save(self, trace_file):
+        """
+        Writes the spans in the Chrome trace event format, with the summary
+        under "summary".
+        """
+        with open(trace_file, "w") as fh:
+            json.dump(
+                {
+                    "traceEvents": self.events,
+                    "displayTimeUnit": "ms",
+                    "summary": self.summary(),
+                },
+                fh,
+            )
+
+    def print_summary(self):
+        table = Table(title="Time per Stage")
+        for column in ["Stage", "Count", "Total ms", "Mean ms", "p50", "p95", "Max"]:
+            table.add_column(column, justify="left" if column == "Stage" else "right")
+        summary = self.summary()
+        for name, stats in sorted(
+            summary.items(), key=lambda item: item[1]["total_ms"], reverse=True
+        ):
+            table.add_row(
+                name,
+                str(stats["count"]),
+                *(
+                    f"{stats[key]:.1f}"
+                    for key in ["total_ms", "mean_ms", "p50_ms", "p95_ms", "max_ms"]
+                ),
+            )
+        rprint(table)
+
+
+# Shared by every module, enabled by the scripts' --trace option.
+tracer = Tracer()
+
+
+@contextmanager
+def traced(trace_file):
+    """
+    Records the spans of the block if trace_file is set, then saves them to
+    trace_file and prints the summary, also when the block calls sys.exit.
+    """
+    if not trace_file:
+        yield
+        return
+    tracer.enable()
+    try:
+        yield
+    finally:
+        tracer.save(trace_file)
+        tracer.print_summary()
+        rprint(f"Trace written to {trace_file}")